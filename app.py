@@ -6,6 +6,7 @@ Main Gradio Application
 import gradio as gr
 import os
 import atexit
+import threading
 from dotenv import load_dotenv
 from src.mcp.client_wrapper import MCPClientWrapper
 from src.ui import (
@@ -30,6 +31,15 @@ except Exception as e:
     print(f"⚠️ Failed to initialize MCP Client: {e}")
     print("The app will attempt to connect when needed.")
 
+# Pre-warm external connections at startup
+def prewarm_connections():
+    """Establish the ElevenLabs connection in the background so the first voice reply skips TCP/TLS setup"""
+    if os.environ.get("ELEVENLABS_API_KEY"):
+        from src.utils.elevenlabs_client import prewarm_elevenlabs_client
+        prewarm_elevenlabs_client()
+
+threading.Thread(target=prewarm_connections, daemon=True).start()
+
 # Register cleanup on exit
 def cleanup_mcp():
     """Cleanup MCP client on app shutdown"""
@@ -44,6 +54,11 @@ def cleanup_mcp():
 atexit.register(cleanup_mcp)
 
 
+def handle_submit(explanation, state):
+    """Stream submit_explanation updates to the UI as each step completes"""
+    yield from submit_explanation(explanation, state, mcp_client)
+
+
 # Build Gradio Interface
 with gr.Blocks(css=CUSTOM_CSS, title="🎓 TeachBack AI", theme='shivi/calm_seafoam') as app:
 
@@ -57,6 +72,7 @@ with gr.Blocks(css=CUSTOM_CSS, title="🎓 TeachBack AI", theme='shivi/calm_seaf
                 mode_dropdown,
                 mode_description,
                 voice_checkbox,
+                voice_quality_radio,
                 start_button,
                 session_status,
                 explanation_input,
@@ -77,19 +93,19 @@ with gr.Blocks(css=CUSTOM_CSS, title="🎓 TeachBack AI", theme='shivi/calm_seaf
             )
 
             start_button.click(
-                fn=lambda topic, mode, voice, state: start_teaching_session(topic, mode, voice, state, mcp_client),
-                inputs=[topic_input, mode_dropdown, voice_checkbox, session_state_component],
+                fn=lambda topic, mode, voice, quality, state: start_teaching_session(topic, mode, voice, state, mcp_client, quality),
+                inputs=[topic_input, mode_dropdown, voice_checkbox, voice_quality_radio, session_state_component],
                 outputs=[session_status, student_response_output, analysis_output, confidence_slider, clarity_slider, session_state_component]
             )
 
             submit_button.click(
-                fn=lambda explanation, state: submit_explanation(explanation, state, mcp_client),
+                fn=handle_submit,
                 inputs=[explanation_input, session_state_component],
                 outputs=[student_response_output, audio_output, analysis_output, confidence_slider, clarity_slider, explanation_input, session_state_component]
             )
 
             explanation_input.submit(
-                fn=lambda explanation, state: submit_explanation(explanation, state, mcp_client),
+                fn=handle_submit,
                 inputs=[explanation_input, session_state_component],
                 outputs=[student_response_output, audio_output, analysis_output, confidence_slider, clarity_slider, explanation_input, session_state_component]
             )
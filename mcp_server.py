@@ -8,6 +8,7 @@ the TeachingAgent functionality as tools for AI assistants and other MCP clients
 import os
 import logging
 import json
+import threading
 from typing import Any, Dict
 from mcp.server import Server
 from mcp.server.stdio import stdio_server
@@ -59,7 +60,9 @@ app = Server("teachback-ai")
 # Initialize the TeachingAgent
 try:
     # Check Modal availability before initializing agent
-    from src.agents.teaching_agent import MODAL_AVAILABLE, analyze_explanation_modal, generate_question_modal
+    from src.agents.teaching_agent import (
+        MODAL_AVAILABLE, analyze_explanation_modal, generate_question_modal, prewarm_modal_functions
+    )
     logger.info(f"Modal availability check: MODAL_AVAILABLE={MODAL_AVAILABLE}")
     logger.info(f"  - analyze_explanation_modal: {analyze_explanation_modal}")
     logger.info(f"  - generate_question_modal: {generate_question_modal}")
@@ -334,6 +337,10 @@ async def main():
     """
     logger.info("Starting TeachBack AI MCP Server...")
 
+    # Resolve Modal function handles in the background while the server starts
+    if MODAL_AVAILABLE:
+        threading.Thread(target=prewarm_modal_functions, daemon=True).start()
+
     async with stdio_server() as (read_stream, write_stream):
         logger.info("Server running on stdio")
         await app.run(
@@ -7,8 +7,10 @@ where users explain topics and receive feedback from AI students with different
 
 import os
 import uuid
+import asyncio
 import time
 import logging
+from functools import lru_cache
 from typing import Dict, List, Optional, Tuple
 from anthropic import Anthropic
 
@@ -21,6 +23,7 @@ if os.environ.get("MODAL_TOKEN_ID") and os.environ.get("MODAL_TOKEN_SECRET"):
     os.environ["MODAL_TOKEN_SECRET"] = os.environ.get("MODAL_TOKEN_SECRET")
 
 # Optional Modal imports for parallel processing
+MODAL_APP_NAME = "teachback-ai"
 MODAL_AVAILABLE = False
 parallel_analyze_and_question = None
 compute_session_analytics = None
@@ -29,19 +32,44 @@ generate_question_modal = None
 
 try:
     import modal
+except ImportError:
+    modal = None
+
+
+@lru_cache(maxsize=None)
+def get_modal_function(name: str):
+    """Look up a deployed Modal function once per process and reuse the handle."""
+    if modal is None:
+        raise ImportError("Modal package not installed")
+    return modal.Function.from_name(MODAL_APP_NAME, name)
+
+
+def prewarm_modal_functions():
+    """Resolve the deployed Modal functions up front so the first call skips the lookup."""
+    for fn in (compute_session_analytics, parallel_analyze_and_question,
+               analyze_explanation_modal, generate_question_modal):
+        hydrate = getattr(fn, "hydrate", None)
+        if hydrate:
+            try:
+                hydrate()
+            except Exception as e:
+                logger.warning(f"Could not prewarm Modal function: {e}")
+
+
+if modal is not None:
     # Try to reference deployed functions from Modal
     try:
-        compute_session_analytics = modal.Function.from_name("teachback-ai", "compute_session_analytics")
-        parallel_analyze_and_question = modal.Function.from_name("teachback-ai", "parallel_analyze_and_question")
-        analyze_explanation_modal = modal.Function.from_name("teachback-ai", "analyze_explanation_modal")
-        generate_question_modal = modal.Function.from_name("teachback-ai", "generate_question_modal")
+        compute_session_analytics = get_modal_function("compute_session_analytics")
+        parallel_analyze_and_question = get_modal_function("parallel_analyze_and_question")
+        analyze_explanation_modal = get_modal_function("analyze_explanation_modal")
+        generate_question_modal = get_modal_function("generate_question_modal")
         MODAL_AVAILABLE = True
         logger.info("[OK] Connected to deployed Modal functions")
     except Exception as lookup_error:
         logger.warning(f"Could not reference deployed Modal functions: {lookup_error}")
         logger.warning("   Make sure you've deployed with: python deploy_modal.py")
         MODAL_AVAILABLE = False
-except ImportError:
+else:
     logger.warning("Modal package not installed")
     MODAL_AVAILABLE = False
 
@@ -135,10 +163,10 @@ class TeachingAgent:
             KeyError: If session_id doesn't exist
             Exception: If API call fails
         """
-        if session_id not in self.sessions:
+        # Resolve the session once and reuse it for the rest of the turn
+        session = self.sessions.get(session_id)
+        if session is None:
             raise KeyError(f"Session {session_id} not found")
-
-        session = self.sessions[session_id]
         topic = session["topic"]
 
         # Try to use Modal first if available
@@ -247,10 +275,10 @@ Respond ONLY with valid JSON, no additional text."""
             ValueError: If mode is invalid
             Exception: If API call fails
         """
-        if session_id not in self.sessions:
+        # Resolve the session once and reuse it for the rest of the turn
+        session = self.sessions.get(session_id)
+        if session is None:
             raise KeyError(f"Session {session_id} not found")
-
-        session = self.sessions[session_id]
         topic = session["topic"]
         history = session["conversation_history"]
 
@@ -258,12 +286,13 @@ Respond ONLY with valid JSON, no additional text."""
         if MODAL_AVAILABLE and generate_question_modal:
             try:
                 logger.info("[MODAL] Using Modal for question generation...")
+                # Only the last 3 turns are used for context, so don't ship the rest
                 question = generate_question_modal.remote(
                     explanation=explanation,
                     mode=mode,
                     analysis=analysis,
                     topic=topic,
-                    conversation_history=history
+                    conversation_history=history[-3:]
                 )
 
                 # Store in conversation history
@@ -420,6 +449,49 @@ Respond with ONLY the question, no additional formatting or explanation."""
             "conversation_history": session["conversation_history"]
         }
 
+    def _parallel_request(self, session_id: str, explanation: str) -> Tuple[dict, dict]:
+        """
+        Resolve a session and build the arguments for parallel_analyze_and_question.
+
+        Args:
+            session_id: The session identifier
+            explanation: The user's explanation text
+
+        Returns:
+            Tuple of (session_dict, request_kwargs)
+
+        Raises:
+            KeyError: If session_id doesn't exist
+        """
+        session = self.sessions.get(session_id)
+        if session is None:
+            raise KeyError(f"Session {session_id} not found")
+
+        request = {
+            "explanation": explanation,
+            "mode": session["mode"],
+            "topic": session["topic"],
+            "conversation_history": session["conversation_history"][-3:]  # Only last 3 turns are used
+        }
+        return session, request
+
+    @staticmethod
+    def _store_parallel_result(session: dict, explanation: str, analysis: dict, question: str):
+        """Record a Modal result in the session, as the local calls do for theirs"""
+        session["analyses"].append(analysis)
+        session["conversation_history"].append({
+            "explanation": explanation,
+            "analysis": analysis,
+            "question": question
+        })
+
+    @staticmethod
+    def _timed_result(label: str, start_time: float, analysis: dict, question: str) -> Tuple[dict, str, float]:
+        """Report how long a parallel turn took and pack the result"""
+        execution_time = time.perf_counter() - start_time
+        print(f"[{label}] {label.title()} execution completed in {execution_time:.2f}s")
+        return (analysis, question, execution_time)
+
     def analyze_and_question_parallel(
         self,
         session_id: str,
@@ -442,38 +514,16 @@ Respond with ONLY the question, no additional formatting or explanation."""
         Raises:
             KeyError: If session_id doesn't exist
         """
-        if session_id not in self.sessions:
-            raise KeyError(f"Session {session_id} not found")
-
-        session = self.sessions[session_id]
-        topic = session["topic"]
-        mode = session["mode"]
-        conversation_history = session["conversation_history"]
-
-        start_time = time.time()
+        session, request = self._parallel_request(session_id, explanation)
+        start_time = time.perf_counter()
 
         # Use Modal if available and enabled
         if self.use_modal and MODAL_AVAILABLE:
             try:
                 print("[MODAL] Using Modal for parallel execution...")
-                analysis, question = parallel_analyze_and_question.remote(
-                    explanation=explanation,
-                    mode=mode,
-                    topic=topic,
-                    conversation_history=conversation_history
-                )
-
-                # Store in session
-                session["analyses"].append(analysis)
-                session["conversation_history"].append({
-                    "explanation": explanation,
-                    "analysis": analysis,
-                    "question": question
-                })
-
-                execution_time = time.time() - start_time
-                print(f"[MODAL] Modal execution completed in {execution_time:.2f}s")
-                return (analysis, question, execution_time)
+                analysis, question = parallel_analyze_and_question.remote(**request)
+                self._store_parallel_result(session, explanation, analysis, question)
+                return self._timed_result("MODAL", start_time, analysis, question)
 
             except Exception as e:
                 print(f"[WARNING] Modal execution failed: {e}, falling back to local execution")
@@ -482,11 +532,51 @@ Respond with ONLY the question, no additional formatting or explanation."""
         # Fallback to local sequential execution
         print("[LOCAL] Using local sequential execution...")
         analysis = self.analyze_explanation(session_id, explanation)
-        question = self.generate_question(session_id, explanation, analysis, mode)
+        question = self.generate_question(session_id, explanation, analysis, request["mode"])
+        return self._timed_result("LOCAL", start_time, analysis, question)
 
-        execution_time = time.time() - start_time
-        print(f"[LOCAL] Local execution completed in {execution_time:.2f}s")
-        return (analysis, question, execution_time)
+    async def analyze_and_question_parallel_async(
+        self,
+        session_id: str,
+        explanation: str
+    ) -> Tuple[dict, str, float]:
+        """
+        Async version of analyze_and_question_parallel.
+
+        Awaits the Modal call instead of blocking on it, so several explanations
+        can be processed concurrently on one event loop. The local fallback runs
+        in a worker thread.
+
+        Args:
+            session_id: The session identifier
+            explanation: The user's explanation text
+
+        Returns:
+            Tuple of (analysis_dict, question_string, execution_time_seconds)
+
+        Raises:
+            KeyError: If session_id doesn't exist
+        """
+        session, request = self._parallel_request(session_id, explanation)
+        start_time = time.perf_counter()
+
+        # Use Modal if available and enabled
+        if self.use_modal and MODAL_AVAILABLE:
+            try:
+                print("[MODAL] Using Modal for parallel execution...")
+                analysis, question = await parallel_analyze_and_question.remote.aio(**request)
+                self._store_parallel_result(session, explanation, analysis, question)
+                return self._timed_result("MODAL", start_time, analysis, question)
+
+            except Exception as e:
+                print(f"[WARNING] Modal execution failed: {e}, falling back to local execution")
+                # Fall through to local execution
+
+        # Fallback to local sequential execution, off the event loop
+        print("[LOCAL] Using local sequential execution...")
+        analysis = await asyncio.to_thread(self.analyze_explanation, session_id, explanation)
+        question = await asyncio.to_thread(self.generate_question, session_id, explanation, analysis, request["mode"])
+        return self._timed_result("LOCAL", start_time, analysis, question)
 
     def trigger_background_analytics(self, session_id: str) -> Optional[str]:
         """
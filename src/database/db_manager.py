@@ -5,6 +5,7 @@ Handles database connections, sessions, and CRUD operations
 
 from sqlalchemy import create_engine, func
 from sqlalchemy.orm import sessionmaker, scoped_session
+from sqlalchemy.pool import StaticPool
 from contextlib import contextmanager
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional, Tuple
@@ -26,14 +27,25 @@ class DatabaseManager:
         Initialize database manager
 
         Args:
-            db_path: Path to SQLite database file
+            db_path: Path to SQLite database file, or ":memory:" for an
+                in-memory database shared by all sessions of this manager
         """
-        # Use absolute path
-        if not os.path.isabs(db_path):
-            db_path = os.path.join(os.getcwd(), db_path)
+        if db_path == ":memory:":
+            # A single shared connection keeps the in-memory database alive
+            self.db_path = db_path
+            self.engine = create_engine(
+                'sqlite://',
+                echo=False,
+                connect_args={"check_same_thread": False},
+                poolclass=StaticPool
+            )
+        else:
+            # Use absolute path
+            if not os.path.isabs(db_path):
+                db_path = os.path.join(os.getcwd(), db_path)
 
-        self.db_path = db_path
-        self.engine = create_engine(f'sqlite:///{db_path}', echo=False)
+            self.db_path = db_path
+            self.engine = create_engine(f'sqlite:///{db_path}', echo=False)
         self.SessionFactory = sessionmaker(bind=self.engine)
         self.Session = scoped_session(self.SessionFactory)
 
@@ -210,6 +222,65 @@ class DatabaseManager:
                 .order_by(Analysis.turn_number)\
                 .all()
 
+    # ==================== TURN OPERATIONS ====================
+
+    def write_turn_atomic(
+        self,
+        session_id: str,
+        turn_number: int,
+        teacher_content: str,
+        student_content: str,
+        analysis: Dict,
+        average_confidence: float,
+        average_clarity: float
+    ):
+        """
+        Save a complete teaching turn in a single transaction
+
+        Writes both conversation messages, the analysis and the session metrics
+        with one commit instead of one per write.
+
+        Args:
+            session_id: Session the turn belongs to
+            turn_number: Turn number within the session
+            teacher_content: The teacher's explanation
+            student_content: The AI student's response
+            analysis: Analysis dict (confidence_score, clarity_score, knowledge_gaps, ...)
+            average_confidence: Session confidence to store (0-1)
+            average_clarity: Session clarity to store (0-1)
+        """
+        with self.session_scope() as session:
+            session.add_all([
+                Conversation(
+                    session_id=session_id,
+                    turn_number=turn_number,
+                    role="teacher",
+                    content=teacher_content
+                ),
+                Conversation(
+                    session_id=session_id,
+                    turn_number=turn_number,
+                    role="student",
+                    content=student_content
+                ),
+                Analysis(
+                    session_id=session_id,
+                    turn_number=turn_number,
+                    confidence_score=analysis["confidence_score"],
+                    clarity_score=analysis["clarity_score"],
+                    knowledge_gaps=analysis.get("knowledge_gaps", []),
+                    unexplained_jargon=analysis.get("unexplained_jargon", []),
+                    strengths=analysis.get("strengths", [])
+                )
+            ])
+
+            teaching_session = session.query(Session).filter_by(id=session_id).first()
+            if teaching_session:
+                teaching_session.turn_count = turn_number
+                teaching_session.average_confidence = average_confidence
+                teaching_session.average_clarity = average_clarity
+                teaching_session.updated_at = datetime.utcnow()
+
     # ==================== KNOWLEDGE GRAPH OPERATIONS ====================
 
     def create_or_update_knowledge_node(
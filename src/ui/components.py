@@ -4,7 +4,8 @@ Reusable Gradio components and helpers
 """
 
 import gradio as gr
-from typing import Dict
+from functools import lru_cache
+from typing import Dict, Tuple
 
 # AI Student Personalities
 STUDENT_MODES = {
@@ -14,6 +15,32 @@ STUDENT_MODES = {
     "😰 Anxious Student": "Worries about edge cases and failure scenarios. Asks 'what if...?' constantly."
 }
 
+# Opening questions used when a session starts without MCP (mode -> topic -> question)
+INITIAL_QUESTION_TEMPLATES = {
+    "🤔 Socratic Student": lambda topic: f"I'm interested in learning about {topic}. What's the core idea behind it, and why should I care?",
+    "😈 Contrarian Student": lambda topic: f"Okay, {topic}... I've heard it's overrated. Why should I believe it's actually important?",
+    "👶 Five-Year-Old Student": lambda topic: f"What's {topic}? Can you explain it like I'm five?",
+    "😰 Anxious Student": lambda topic: f"I'm worried about learning {topic}... What if I don't understand it? Where do I even start?"
+}
+
+# Canned student replies used when the AI student can't be reached
+FALLBACK_RESPONSES = {
+    "🤔 Socratic Student": "That's interesting. But why does that work? Can you break down the underlying principle?",
+    "😈 Contrarian Student": "I disagree. What about the cases where that doesn't work? Give me a counterexample.",
+    "👶 Five-Year-Old Student": "But why? I don't understand those big words. Can you explain simpler?",
+    "😰 Anxious Student": "Wait, what if something goes wrong? What are the edge cases I should worry about?"
+}
+
+
+def _default_initial_question(topic: str) -> str:
+    """Opening question for modes without a template"""
+    return f"Tell me about {topic}. What is it?"
+
+
+def get_initial_question(mode: str, topic: str) -> str:
+    """Get the fallback opening question for a student mode"""
+    return INITIAL_QUESTION_TEMPLATES.get(mode, _default_initial_question)(topic)
+
 
 def create_initial_state() -> Dict:
     """Create initial session state"""
@@ -23,10 +50,12 @@ def create_initial_state() -> Dict:
         "topic": None,
         "mode": None,
         "voice_enabled": False,
+        "voice_quality": "low",
         "turn_count": 0,
         "max_turns": 10,
         "conversation_history": [],
         "knowledge_gaps": [],
+        "_gap_set": set(),  # O(1) duplicate check for knowledge_gaps
         "confidence_score": 0,
         "clarity_score": 0,
         "last_analysis": None,
@@ -36,27 +65,46 @@ def create_initial_state() -> Dict:
 
 def get_analysis_panel(state: Dict) -> str:
     """Generate the analysis panel as markdown with MCP analysis details"""
-    gaps = state.get("knowledge_gaps", [])
-    turn = state.get("turn_count", 0)
-    max_turn = state.get("max_turns", 10)
-    last_analysis = state.get("last_analysis")
-
+    last_analysis = state.get("last_analysis") or {}
+
+    # lru_cache hashes its arguments, so pass tuples of strings (the analyzer's
+    # lists may hold dicts, which would raise TypeError here and again on the
+    # error path that re-renders the panel)
+    return _render_analysis_panel(
+        _as_key(state.get("knowledge_gaps")),
+        state.get("turn_count", 0),
+        state.get("max_turns", 10),
+        _as_key(last_analysis.get("unexplained_jargon")),
+        _as_key(last_analysis.get("strengths"))
+    )
+
+
+def _as_key(items) -> Tuple[str, ...]:
+    """Turn a rendered list into a hashable cache key"""
+    return tuple(str(item) for item in items or ())
+
+
+@lru_cache(maxsize=64)
+def _render_analysis_panel(
+    gaps: Tuple[str, ...],
+    turn: int,
+    max_turn: int,
+    unexplained: Tuple[str, ...],
+    strengths: Tuple[str, ...]
+) -> str:
+    """Build the analysis panel markdown (memoized on the rendered fields)"""
     # Format knowledge gaps
     gaps_text = "\n".join([f"• {gap}" for gap in gaps]) if gaps else "None detected yet"
 
     # Add detailed analysis if available
     detailed_analysis = ""
-    if last_analysis:
-        unexplained = last_analysis.get("unexplained_jargon", [])
-        strengths = last_analysis.get("strengths", [])
-
-        if unexplained:
-            detailed_analysis += "\n\n### ⚠️ Unexplained Jargon:\n"
-            detailed_analysis += "\n".join([f"• {term}" for term in unexplained])
+    if unexplained:
+        detailed_analysis += "\n\n### ⚠️ Unexplained Jargon:\n"
+        detailed_analysis += "\n".join([f"• {term}" for term in unexplained])
 
-        if strengths:
-            detailed_analysis += "\n\n### ✅ Strengths:\n"
-            detailed_analysis += "\n".join([f"• {strength}" for strength in strengths])
+    if strengths:
+        detailed_analysis += "\n\n### ✅ Strengths:\n"
+        detailed_analysis += "\n".join([f"• {strength}" for strength in strengths])
 
     analysis_md = f"""
 ### 🎯 Knowledge Gaps Found:
@@ -4,18 +4,41 @@ Event handling functions for UI interactions
 """
 
 import os
-from typing import Optional, Dict, Tuple
+import re
+import unicodedata
+import gradio as gr
+from typing import Optional, Dict, Tuple, Iterator
 from src.mcp.client_wrapper import MCPClientWrapper
-from src.utils.elevenlabs_client import text_to_speech_file
 from src.database.db_manager import DatabaseManager
 from src.services.knowledge_graph import KnowledgeGraphService
 from src.services.spaced_repetition import SpacedRepetitionService
-from .components import get_analysis_panel, create_initial_state, STUDENT_MODES
+from .components import (
+    get_analysis_panel,
+    get_initial_question,
+    create_initial_state,
+    STUDENT_MODES,
+    FALLBACK_RESPONSES
+)
+
+# Longest explanation sent to the AI student (longer pastes make slow, costly calls)
+MAX_EXPLANATION_LENGTH = 8000
+
+# Input made only of whitespace, punctuation and underscores (\W already covers whitespace)
+_NO_CONTENT_RE = re.compile(r"^[\W_]*$")
+
+# UI student modes mapped to MCP mode names
+MCP_MODES = {
+    "🤔 Socratic Student": "socratic",
+    "😈 Contrarian Student": "contrarian",
+    "👶 Five-Year-Old Student": "five-year-old",
+    "😰 Anxious Student": "anxious"
+}
 
 # Initialize database and services (singleton pattern)
 _db_manager = None
 _kg_service = None
 _sr_service = None
+_mcp_client = None
 
 
 def get_db_manager():
@@ -42,42 +65,71 @@ def get_sr_service():
     return _sr_service
 
 
+def get_mcp_client():
+    """Get or create MCP client singleton (reuses the server connection across requests)"""
+    global _mcp_client
+    if _mcp_client is None:
+        _mcp_client = MCPClientWrapper(timeout=120)
+    return _mcp_client
+
+
 def is_modal_enabled():
     """Check if Modal is enabled via environment variable"""
     return os.environ.get("USE_MODAL", "false").lower() == "true"
 
 
+def _panel(state: Dict, refresh: bool):
+    """Analysis panel markdown, or a no-op update when the state didn't change"""
+    return get_analysis_panel(state) if refresh else gr.update()
+
+
+def _session_result(
+    state: Dict,
+    msg: str,
+    question: str = "",
+    refresh_panel: bool = True
+) -> Tuple[str, str, str, int, int, Dict]:
+    """Pack start_teaching_session outputs in the order the UI expects"""
+    return msg, question, _panel(state, refresh_panel), state["confidence_score"], state["clarity_score"], state
+
+
+def _result(
+    state: Dict,
+    msg: str,
+    audio: Optional[str] = None,
+    explanation: str = "",
+    refresh_panel: bool = True
+) -> Tuple[str, Optional[str], str, int, int, str, Dict]:
+    """Pack submit_explanation outputs in the order the UI expects"""
+    return msg, audio, _panel(state, refresh_panel), state["confidence_score"], state["clarity_score"], explanation, state
+
+
 def start_teaching_session(
     topic: str,
     mode: str,
     voice_enabled: bool,
     state: Dict,
-    mcp_client: MCPClientWrapper
+    mcp_client: MCPClientWrapper,
+    voice_quality: str = "low"
 ) -> Tuple[str, str, str, int, int, Dict]:
     """Initialize a new teaching session using MCP"""
 
     if not topic or not topic.strip():
-        return "⚠️ Please enter a topic to teach!", "", get_analysis_panel(state), 0, 0, state
+        return _session_result(state, "⚠️ Please enter a topic to teach!", refresh_panel=False)
 
     # Reset session state
     state = create_initial_state()
     state["topic"] = topic
     state["mode"] = mode
     state["voice_enabled"] = voice_enabled
+    state["voice_quality"] = voice_quality
 
     try:
         # Convert mode to MCP format (remove emoji prefix)
-        mode_map = {
-            "🤔 Socratic Student": "socratic",
-            "😈 Contrarian Student": "contrarian",
-            "👶 Five-Year-Old Student": "five-year-old",
-            "😰 Anxious Student": "anxious"
-        }
-        mcp_mode = mode_map.get(mode, "socratic")
+        mcp_mode = MCP_MODES.get(mode, "socratic")
 
         # Call MCP to create session
-        if not mcp_client:
-            mcp_client = MCPClientWrapper(timeout=120)
+        mcp_client = mcp_client or get_mcp_client()
 
         result = mcp_client.create_teaching_session(
             user_id=state["user_id"],
@@ -118,7 +170,7 @@ def start_teaching_session(
 
         status_msg = f"✅ Session started via MCP! Teaching: **{topic}** | Mode: **{mode}** | Session ID: `{state['session_id'][:8]}...`"
 
-        return status_msg, initial_question, get_analysis_panel(state), 0, 0, state
+        return _session_result(state, status_msg, initial_question)
 
     except Exception as e:
         # Fallback to local session if MCP fails
@@ -126,53 +178,67 @@ def start_teaching_session(
         print(f"MCP Error: {e}")
 
         # Generate fallback initial question
-        initial_questions = {
-            "🤔 Socratic Student": f"I'm interested in learning about {topic}. What's the core idea behind it, and why should I care?",
-            "😈 Contrarian Student": f"Okay, {topic}... I've heard it's overrated. Why should I believe it's actually important?",
-            "👶 Five-Year-Old Student": f"What's {topic}? Can you explain it like I'm five?",
-            "😰 Anxious Student": f"I'm worried about learning {topic}... What if I don't understand it? Where do I even start?"
-        }
-        initial_question = initial_questions.get(mode, f"Tell me about {topic}. What is it?")
+        initial_question = get_initial_question(mode, topic)
         state["conversation_history"].append({"role": "student", "content": initial_question})
 
-        return error_msg, initial_question, get_analysis_panel(state), 0, 0, state
+        return _session_result(state, error_msg, initial_question)
 
 
 def submit_explanation(
     explanation: str,
     state: Dict,
     mcp_client: MCPClientWrapper
-) -> Tuple[str, Optional[str], str, int, int, str, Dict]:
-    """Process user's explanation and generate AI student response using MCP"""
+) -> Iterator[Tuple[str, Optional[str], str, int, int, str, Dict]]:
+    """
+    Process user's explanation and generate AI student response using MCP
+
+    Yields partial UI updates as each step finishes (analysis, then the student
+    response, then audio) so Gradio can render them progressively.
+    """
 
     if not explanation or not explanation.strip():
-        return "⚠️ Please provide an explanation!", None, get_analysis_panel(state), state["confidence_score"], state["clarity_score"], explanation, state
+        yield _result(state, "⚠️ Please provide an explanation!", explanation=explanation, refresh_panel=False)
+        return
+
+    # Normalize look-alike Unicode forms so identical text always compares equal.
+    # This runs first so the checks below see the text that is actually sent on
+    # (NFKC can change the length, e.g. "ﬁ" -> "fi")
+    explanation = unicodedata.normalize("NFKC", explanation)
+
+    # Cheap input checks before any MCP/Claude round-trip
+    if len(explanation) > MAX_EXPLANATION_LENGTH:
+        yield _result(state, f"⚠️ Explanation too long (max {MAX_EXPLANATION_LENGTH} characters). Please shorten it!", explanation=explanation, refresh_panel=False)
+        return
+
+    if _NO_CONTENT_RE.match(explanation):
+        yield _result(state, "⚠️ Your explanation needs some actual words!", explanation=explanation, refresh_panel=False)
+        return
 
     if not state["topic"] or not state.get("session_id"):
-        return "⚠️ Please start a teaching session first!", None, get_analysis_panel(state), 0, 0, explanation, state
+        yield _result(state, "⚠️ Please start a teaching session first!", explanation=explanation, refresh_panel=False)
+        return
 
     # Increment turn count
     state["turn_count"] += 1
 
+    # Bind values read throughout the turn once (they don't change below)
+    session_id = state["session_id"]
+    turn = state["turn_count"]
+    topic = state["topic"]
+    user_id = state["user_id"]
+
     # Add user explanation to history
     state["conversation_history"].append({"role": "teacher", "content": explanation})
 
     try:
         # Convert mode to MCP format
-        mode_map = {
-            "🤔 Socratic Student": "socratic",
-            "😈 Contrarian Student": "contrarian",
-            "👶 Five-Year-Old Student": "five-year-old",
-            "😰 Anxious Student": "anxious"
-        }
-        mcp_mode = mode_map.get(state["mode"], "socratic")
+        mcp_mode = MCP_MODES.get(state["mode"], "socratic")
 
         # Step 1: Analyze explanation using MCP
-        if not mcp_client:
-            mcp_client = MCPClientWrapper(timeout=120)
+        mcp_client = mcp_client or get_mcp_client()
 
         analysis = mcp_client.analyze_explanation(
-            session_id=state["session_id"],
+            session_id=session_id,
             explanation=explanation
         )
 
@@ -186,14 +252,23 @@ def submit_explanation(
             state["all_analyses"] = []
         state["all_analyses"].append(analysis)
 
-        # Update knowledge gaps (avoid duplicates)
-        for gap in analysis.get("knowledge_gaps", []):
-            if gap not in state["knowledge_gaps"]:
-                state["knowledge_gaps"].append(gap)
+        # Update knowledge gaps (avoid duplicates via the parallel set, keeping order).
+        # Gaps are coerced to str on the way in: the set, the dedup and the memoized
+        # analysis panel all hash them, and a dict from the analyzer would not hash
+        if "_gap_set" not in state:
+            state["_gap_set"] = set(state["knowledge_gaps"])
+        gap_set = state["_gap_set"]
+        incoming = dict.fromkeys(str(gap) for gap in analysis.get("knowledge_gaps") or [])
+        new_gaps = [gap for gap in incoming if gap not in gap_set]
+        state["knowledge_gaps"].extend(new_gaps)
+        gap_set.update(new_gaps)
+
+        # Show analysis results while the student response is generated
+        yield _result(state, "*🤔 Student is thinking...*")
 
         # Step 2: Generate student question using MCP
         student_response = mcp_client.generate_question(
-            session_id=state["session_id"],
+            session_id=session_id,
             explanation=explanation,
             analysis=analysis,
             mode=mcp_mode
@@ -203,7 +278,7 @@ def submit_explanation(
         state["conversation_history"].append({"role": "student", "content": student_response})
 
         # Trigger background analytics every 5 interactions if Modal is enabled
-        if is_modal_enabled() and state["turn_count"] % 5 == 0:
+        if is_modal_enabled() and turn % 5 == 0:
             try:
                 # Import the deployed Modal function directly
                 from src.agents.teaching_agent import compute_session_analytics, MODAL_AVAILABLE
@@ -211,13 +286,13 @@ def submit_explanation(
                 if MODAL_AVAILABLE and compute_session_analytics:
                     # Build session history with all analyses
                     session_data = {
-                        "topic": state["topic"],
+                        "topic": topic,
                         "mode": mcp_mode,
                         "conversation_history": state["conversation_history"],
                         "analyses": state.get("all_analyses", [])
                     }
 
-                    print(f"[ANALYTICS] Triggering background analytics computation (turn {state['turn_count']})...")
+                    print(f"[ANALYTICS] Triggering background analytics computation (turn {turn})...")
                     print(f"[ANALYTICS] Session data: {len(session_data['analyses'])} analyses")
                     call = compute_session_analytics.spawn(session_data)
                     print(f"[ANALYTICS] Analytics task spawned (call_id: {call.object_id})")
@@ -227,39 +302,20 @@ def submit_explanation(
             except Exception as bg_error:
                 print(f"[WARNING] Background analytics error: {bg_error}")
 
+        # Show the student response before persisting the turn and generating voice
+        yield _result(state, student_response)
+
         # Save to database
         try:
             db = get_db_manager()
 
-            # Save conversation turns
-            db.add_conversation_turn(
-                session_id=state["session_id"],
-                turn_number=state["turn_count"],
-                role="teacher",
-                content=explanation
-            )
-            db.add_conversation_turn(
-                session_id=state["session_id"],
-                turn_number=state["turn_count"],
-                role="student",
-                content=student_response
-            )
-
-            # Save analysis
-            db.add_analysis(
-                session_id=state["session_id"],
-                turn_number=state["turn_count"],
-                confidence_score=analysis["confidence_score"],
-                clarity_score=analysis["clarity_score"],
-                knowledge_gaps=analysis.get("knowledge_gaps", []),
-                unexplained_jargon=analysis.get("unexplained_jargon", []),
-                strengths=analysis.get("strengths", [])
-            )
-
-            # Update session metrics
-            db.update_session_metrics(
-                session_id=state["session_id"],
-                turn_count=state["turn_count"],
+            # Save conversation turns, analysis and session metrics in one transaction
+            db.write_turn_atomic(
+                session_id=session_id,
+                turn_number=turn,
+                teacher_content=explanation,
+                student_content=student_response,
+                analysis=analysis,
                 average_confidence=state["confidence_score"] / 100,
                 average_clarity=state["clarity_score"] / 100
             )
@@ -271,13 +327,13 @@ def submit_explanation(
                 related_concepts = []  # Skip KG extraction
                 # kg_service = get_kg_service()
                 # related_concepts = kg_service.extract_related_concepts(
-                #     state["topic"],
+                #     topic,
                 #     state["conversation_history"]
                 # )
 
                 db.create_or_update_knowledge_node(
-                    user_id=state["user_id"],
-                    topic=state["topic"],
+                    user_id=user_id,
+                    topic=topic,
                     confidence=state["confidence_score"] / 100,
                     clarity=state["clarity_score"] / 100,
                     related_concepts=related_concepts,
@@ -287,17 +343,17 @@ def submit_explanation(
                 # Create edges for related concepts
                 for related in related_concepts:
                     db.create_or_update_knowledge_node(
-                        user_id=state["user_id"],
+                        user_id=user_id,
                         topic=related,
                         confidence=0.5,
                         clarity=0.5,
-                        related_concepts=[state["topic"]],
+                        related_concepts=[topic],
                         gaps=[]
                     )
                     db.create_knowledge_edge(
-                        from_topic=state["topic"],
+                        from_topic=topic,
                         to_topic=related,
-                        user_id=state["user_id"],
+                        user_id=user_id,
                         relationship_type="related_to"
                     )
             except Exception as kg_error:
@@ -312,36 +368,39 @@ def submit_explanation(
         audio_path = None
         if state["voice_enabled"]:
             try:
+                # Imported on first use so the ElevenLabs SDK only loads when voice is enabled
+                from src.utils.elevenlabs_client import text_to_speech_file, QUALITY_PRESETS, DEFAULT_OUTPUT_FORMAT
+
                 audio_path = text_to_speech_file(
                     text=student_response,
                     mode=state["mode"],
-                    output_filename=f"response_{state['turn_count']}.mp3"
+                    output_format=QUALITY_PRESETS.get(state.get("voice_quality"), DEFAULT_OUTPUT_FORMAT)
                 )
             except Exception as e:
                 print(f"Voice generation error: {e}")
                 # Continue without voice if error occurs
 
         # Check if session should end
-        if state["turn_count"] >= state["max_turns"]:
-            student_response += f"\n\n---\n**Session complete!** You've completed {state['turn_count']} turns. Great teaching!"
+        if turn >= state["max_turns"]:
+            student_response += f"\n\n---\n**Session complete!** You've completed {turn} turns. Great teaching!"
 
             # Mark session as complete and update spaced repetition
             try:
                 db = get_db_manager()
                 db.complete_session(
-                    session_id=state["session_id"],
+                    session_id=session_id,
                     final_confidence=state["confidence_score"] / 100,
                     final_clarity=state["clarity_score"] / 100
                 )
 
                 # Update progress metrics
-                db.update_progress_metrics(state["user_id"])
+                db.update_progress_metrics(user_id)
 
                 # Auto-create spaced repetition review
                 sr_service = get_sr_service()
                 sr_service.auto_create_review_from_session(
-                    user_id=state["user_id"],
-                    topic=state["topic"],
+                    user_id=user_id,
+                    topic=topic,
                     confidence=state["confidence_score"] / 100,
                     clarity=state["clarity_score"] / 100,
                     knowledge_gaps=state["knowledge_gaps"]
@@ -349,7 +408,7 @@ def submit_explanation(
             except Exception as db_error:
                 print(f"Session completion error: {db_error}")
 
-        return student_response, audio_path, get_analysis_panel(state), state["confidence_score"], state["clarity_score"], "", state
+        yield _result(state, student_response, audio_path)
 
     except Exception as e:
         # Fallback error handling
@@ -357,18 +416,12 @@ def submit_explanation(
         print(f"MCP Error in submit_explanation: {e}")
 
         # Return error without updating state much
-        return error_msg, None, get_analysis_panel(state), state["confidence_score"], state["clarity_score"], explanation, state
+        yield _result(state, error_msg, explanation=explanation)
 
 
 def generate_student_response_fallback(explanation: str, mode: str) -> str:
     """Fallback student response if Claude API fails"""
-    responses = {
-        "🤔 Socratic Student": "That's interesting. But why does that work? Can you break down the underlying principle?",
-        "😈 Contrarian Student": "I disagree. What about the cases where that doesn't work? Give me a counterexample.",
-        "👶 Five-Year-Old Student": "But why? I don't understand those big words. Can you explain simpler?",
-        "😰 Anxious Student": "Wait, what if something goes wrong? What are the edge cases I should worry about?"
-    }
-    return responses.get(mode, "Can you explain that in more detail?")
+    return FALLBACK_RESPONSES.get(mode, "Can you explain that in more detail?")
 
 
 def update_mode_description(mode: str) -> str:
@@ -41,10 +41,17 @@ def create_session_setup_layout() -> Tuple:
             info="AI student will speak responses with personality-matched voices"
         )
 
+        voice_quality_radio = gr.Radio(
+            choices=[("Standard", "low"), ("High quality", "hi")],
+            value="low",
+            label="🎚️ Voice Quality",
+            info="Standard audio is smaller and arrives faster"
+        )
+
         start_button = gr.Button("🚀 Start Teaching Session", variant="primary", size="lg")
         session_status = gr.Markdown("")
 
-    return topic_input, mode_dropdown, mode_description, voice_checkbox, start_button, session_status
+    return topic_input, mode_dropdown, mode_description, voice_checkbox, voice_quality_radio, start_button, session_status
 
 
 def create_teaching_interface_layout() -> Tuple:
@@ -125,7 +132,7 @@ def create_main_layout(mcp_client) -> Tuple:
         # RIGHT COLUMN - Main Content
         with gr.Column(scale=4, min_width=600):
             # Session Setup
-            topic_input, mode_dropdown, mode_description, voice_checkbox, start_button, session_status = create_session_setup_layout()
+            topic_input, mode_dropdown, mode_description, voice_checkbox, voice_quality_radio, start_button, session_status = create_session_setup_layout()
 
             # Teaching Interface + Analysis Panel
             with gr.Row():
@@ -143,6 +150,7 @@ def create_main_layout(mcp_client) -> Tuple:
         mode_dropdown,
         mode_description,
         voice_checkbox,
+        voice_quality_radio,
         start_button,
         session_status,
         explanation_input,
@@ -2,12 +2,34 @@
 TeachBack AI Utilities
 """
 
-from .claude_client import generate_ai_student_response, analyze_explanation_with_claude
-from .elevenlabs_client import text_to_speech_file, generate_voice_response
-
-__all__ = [
-    'generate_ai_student_response',
-    'analyze_explanation_with_claude',
-    'text_to_speech_file',
-    'generate_voice_response'
-]
+import importlib
+
+# Attributes are loaded lazily (PEP 562) so importing src.utils doesn't pull in
+# the Anthropic and ElevenLabs SDKs until a client function is actually used
+_LAZY_ATTRS = {
+    'generate_ai_student_response': '.claude_client',
+    'analyze_explanation_with_claude': '.claude_client',
+    'text_to_speech_file': '.elevenlabs_client',
+    'generate_voice_response': '.elevenlabs_client',
+    'atext_to_speech_file': '.elevenlabs_client',
+    'agenerate_voice_response': '.elevenlabs_client',
+    'generate_voice_response_streamed': '.elevenlabs_client',
+    'get_tts_worker_pool': '.elevenlabs_client'
+}
+
+__all__ = list(_LAZY_ATTRS)
+
+
+def __getattr__(name):
+    """Import the client module that defines name on first access"""
+    if name in _LAZY_ATTRS:
+        module = importlib.import_module(_LAZY_ATTRS[name], __name__)
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    """Include lazy attributes in dir() output"""
+    return sorted(list(globals()) + __all__)
@@ -4,9 +4,14 @@ Handles AI student responses and analysis using Anthropic Claude
 """
 
 import os
+import re
+import orjson
 from anthropic import Anthropic
 from typing import Dict, List, Optional
 
+# Matches from the first "{" to the last "}" of a response that wraps JSON in prose
+_JSON_RE = re.compile(r"\{.*\}", re.DOTALL)
+
 # Initialize Anthropic client
 def get_claude_client():
     """Get initialized Claude client"""
@@ -16,6 +21,27 @@ def get_claude_client():
     return Anthropic(api_key=api_key)
 
 
+# Conversation roles mapped to Claude message roles
+_ROLE_MAP = {
+    "student": "assistant",  # AI student speaks as assistant
+    "teacher": "user"        # Teacher speaks as user
+}
+
+# Number of recent conversation entries sent verbatim to Claude each turn
+HISTORY_WINDOW = 12
+
+# Maximum length of the summary that stands in for older conversation entries
+HISTORY_SUMMARY_MAX_CHARS = 500
+
+
+def _summarize_history(entries: List[Dict[str, str]]) -> str:
+    """Cheaply summarize older conversation entries (teacher turns, truncated)"""
+    teacher_text = " ".join(e["content"] for e in entries if e.get("role") == "teacher")
+    if len(teacher_text) > HISTORY_SUMMARY_MAX_CHARS:
+        teacher_text = teacher_text[:HISTORY_SUMMARY_MAX_CHARS] + "..."
+    return f"(Summary of what the teacher explained earlier: {teacher_text})"
+
+
 # AI Student Personality System Prompts
 STUDENT_PERSONALITIES = {
     "🤔 Socratic Student": {
@@ -100,6 +126,29 @@ Keep responses concise (2-4 sentences). Sound worried and uncertain."""
 }
 
 
+# Analysis instructions (kept free of per-call values so Claude can cache them)
+ANALYSIS_SYSTEM_PROMPT = """You are an expert educator analyzing a teacher's explanation of the topic given below.
+
+Analyze the teacher's latest explanation for:
+1. **Confidence Score (0-100)**: How confident and certain is the teacher?
+   - Deduct points for hedging language: "I think", "maybe", "probably", "kind of", "sort of"
+   - Award points for definitive statements and clear assertions
+
+2. **Clarity Score (0-100)**: How clear and well-structured is the explanation?
+   - Award points for: simple language, good analogies, logical flow, concrete examples
+   - Deduct points for: jargon without explanation, circular reasoning, vagueness
+
+3. **Knowledge Gaps**: Specific concepts the teacher avoided, glossed over, or explained poorly
+
+Respond in this EXACT JSON format:
+{
+  "confidence_score": 75,
+  "clarity_score": 80,
+  "knowledge_gaps": ["Did not explain the base case", "Avoided discussing time complexity"],
+  "reasoning": "Brief explanation of scores"
+}"""
+
+
 def generate_ai_student_response(
     topic: str,
     mode: str,
@@ -125,32 +174,43 @@ def generate_ai_student_response(
         personality = STUDENT_PERSONALITIES.get(mode, {})
         system_prompt = personality.get("system_prompt", "You are a curious student learning about a topic.")
 
-        # Add context to system prompt
-        full_system_prompt = f"""{system_prompt}
-
-TOPIC BEING TAUGHT: {topic}
+        # Personality prompt is identical for every call in a mode, so mark it cacheable;
+        # the per-turn context goes in a separate uncached block
+        system_blocks = [
+            {
+                "type": "text",
+                "text": system_prompt,
+                "cache_control": {"type": "ephemeral"}
+            },
+            {
+                "type": "text",
+                "text": f"""TOPIC BEING TAUGHT: {topic}
 TURN NUMBER: {turn_count}/10
 
 Remember to stay in character and ask questions that help the teacher improve their understanding."""
+            }
+        ]
 
-        # Build conversation messages for Claude
+        # Build conversation messages for Claude from the most recent turns only,
+        # with older teacher turns folded into one short summary message
+        recent = conversation_history[-HISTORY_WINDOW:]
         messages = []
-        for entry in conversation_history:
-            role_map = {
-                "student": "assistant",  # AI student speaks as assistant
-                "teacher": "user"        # Teacher speaks as user
-            }
+        if len(conversation_history) > HISTORY_WINDOW:
             messages.append({
-                "role": role_map.get(entry["role"], "user"),
-                "content": entry["content"]
+                "role": "user",
+                "content": _summarize_history(conversation_history[:-HISTORY_WINDOW])
             })
+        messages += [
+            {"role": _ROLE_MAP.get(entry["role"], "user"), "content": entry["content"]}
+            for entry in recent
+        ]
 
         # Call Claude API
         response = client.messages.create(
             model="claude-sonnet-4-5-20250929",  # Faster than Opus
             max_tokens=300,
             temperature=0.7,
-            system=full_system_prompt,
+            system=system_blocks,
             messages=messages
         )
 
@@ -163,6 +223,8 @@ Remember to stay in character and ask questions that help the teacher improve th
         return "I'm having trouble processing that. Can you try explaining it a different way?"
 
 
+
+
 def analyze_explanation_with_claude(
     topic: str,
     explanation: str,
@@ -182,48 +244,32 @@ def analyze_explanation_with_claude(
     try:
         client = get_claude_client()
 
-        # Analysis system prompt
-        analysis_prompt = f"""You are an expert educator analyzing a teacher's explanation of: {topic}
-
-Analyze the teacher's latest explanation for:
-1. **Confidence Score (0-100)**: How confident and certain is the teacher?
-   - Deduct points for hedging language: "I think", "maybe", "probably", "kind of", "sort of"
-   - Award points for definitive statements and clear assertions
-
-2. **Clarity Score (0-100)**: How clear and well-structured is the explanation?
-   - Award points for: simple language, good analogies, logical flow, concrete examples
-   - Deduct points for: jargon without explanation, circular reasoning, vagueness
-
-3. **Knowledge Gaps**: Specific concepts the teacher avoided, glossed over, or explained poorly
-
-Respond in this EXACT JSON format:
-{{
-  "confidence_score": 75,
-  "clarity_score": 80,
-  "knowledge_gaps": ["Did not explain the base case", "Avoided discussing time complexity"],
-  "reasoning": "Brief explanation of scores"
-}}
-
-TEACHER'S EXPLANATION:
-{explanation}"""
-
+        # Static instructions go in a cached system block; topic and explanation vary per call
         response = client.messages.create(
             model="claude-sonnet-4-5-20250929",  # Faster than Opus
             max_tokens=500,
             temperature=0.3,
-            messages=[{"role": "user", "content": analysis_prompt}]
+            system=[{
+                "type": "text",
+                "text": ANALYSIS_SYSTEM_PROMPT,
+                "cache_control": {"type": "ephemeral"}
+            }],
+            messages=[{
+                "role": "user",
+                "content": f"""TOPIC BEING TAUGHT: {topic}
+
+TEACHER'S EXPLANATION:
+{explanation}"""
+            }]
         )
 
         # Parse JSON response
-        import json
         result_text = response.content[0].text
 
-        # Try to extract JSON from response
-        if "{" in result_text and "}" in result_text:
-            json_start = result_text.index("{")
-            json_end = result_text.rindex("}") + 1
-            json_str = result_text[json_start:json_end]
-            analysis = json.loads(json_str)
+        # Try to extract JSON from response (outermost {...} block in one pass)
+        match = _JSON_RE.search(result_text)
+        if match:
+            analysis = orjson.loads(match.group(0))
 
             return {
                 "confidence_score": min(100, max(0, analysis.get("confidence_score", 50))),
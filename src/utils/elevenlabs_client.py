@@ -4,17 +4,96 @@ Generates voice responses for AI student personalities
 """
 
 import os
+import re
+import asyncio
+import shutil
+import hashlib
+import tempfile
+import threading
+import weakref
+from concurrent.futures import Future
+from functools import lru_cache
+import httpx
 from elevenlabs import VoiceSettings
-from elevenlabs.client import ElevenLabs
-from typing import Optional
+from elevenlabs.client import AsyncElevenLabs, ElevenLabs
+from typing import AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple, Union
 
-# Initialize ElevenLabs client
+# HTTP/2 lets concurrent TTS requests share one TLS connection (needs httpx[http2])
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# Shared connection settings for the sync and async clients
+HTTP_LIMITS = httpx.Limits(max_keepalive_connections=8, keepalive_expiry=60)
+# The SDK sends this as a per-request timeout, overriding anything set on the httpx client
+HTTP_TIMEOUT = 240
+
+# Initialize ElevenLabs client once per process so its HTTP/TLS connections are reused
+@lru_cache(maxsize=1)
 def get_elevenlabs_client():
     """Get initialized ElevenLabs client"""
     api_key = os.getenv("ELEVENLABS_API_KEY")
     if not api_key:
         raise ValueError("ELEVENLABS_API_KEY not found in environment variables")
-    return ElevenLabs(api_key=api_key)
+    return ElevenLabs(
+        api_key=api_key,
+        timeout=HTTP_TIMEOUT,
+        httpx_client=httpx.Client(
+            http2=HTTP2_AVAILABLE,
+            limits=HTTP_LIMITS,
+            timeout=HTTP_TIMEOUT,
+            follow_redirects=True  # the SDK's own client follows redirects
+        )
+    )
+
+
+# Async clients are tied to the event loop they were created on, so keep one per loop
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncElevenLabs]" = weakref.WeakKeyDictionary()
+
+
+def get_async_elevenlabs_client() -> AsyncElevenLabs:
+    """Get initialized async ElevenLabs client for the running event loop"""
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        api_key = os.getenv("ELEVENLABS_API_KEY")
+        if not api_key:
+            raise ValueError("ELEVENLABS_API_KEY not found in environment variables")
+        client = AsyncElevenLabs(
+            api_key=api_key,
+            timeout=HTTP_TIMEOUT,
+            httpx_client=httpx.AsyncClient(
+                http2=HTTP2_AVAILABLE,
+                limits=HTTP_LIMITS,
+                timeout=HTTP_TIMEOUT,
+                follow_redirects=True  # the SDK's own client follows redirects
+            )
+        )
+        _async_clients[loop] = client
+    return client
+
+
+async def _aprewarm_elevenlabs_client():
+    """List models on the running loop's async client"""
+    await get_async_elevenlabs_client().models.list()
+
+
+def prewarm_elevenlabs_client():
+    """Open the TTS worker pool's HTTPS connection ahead of the first TTS request"""
+    try:
+        # Listing models is free and establishes the keep-alive connection
+        pool = get_tts_worker_pool()
+        asyncio.run_coroutine_threadsafe(_aprewarm_elevenlabs_client(), pool.loop).result()
+    except Exception as e:
+        print(f"Warning: ElevenLabs prewarm failed: {e}")
+
+
+def reset_client():
+    """Drop the cached ElevenLabs clients (for tests)"""
+    get_elevenlabs_client.cache_clear()
+    _async_clients.clear()
 
 
 # Voice IDs for different AI student personalities
@@ -50,58 +129,245 @@ VOICE_PERSONALITIES = {
     }
 }
 
+# Build each personality's VoiceSettings once instead of per utterance
+for _personality in VOICE_PERSONALITIES.values():
+    _personality["settings"] = VoiceSettings(
+        stability=_personality["stability"],
+        similarity_boost=_personality["similarity_boost"],
+        style=_personality.get("style", 0.5),
+        use_speaker_boost=True
+    )
+
+# mode -> (voice_id, settings) for a single lookup per request
+_PERSONALITY = {mode: (p["voice_id"], p["settings"]) for mode, p in VOICE_PERSONALITIES.items()}
+
+
+# Content-addressed cache of generated audio (repeated utterances skip the API).
+# It lives in the temp dir because text_to_speech_file hands cache paths to
+# gr.Audio, and Gradio only serves files from the cwd, the temp dir or allowed_paths.
+TTS_CACHE_DIR = os.path.join(tempfile.gettempdir(), "teachback_tts")
+TTS_CACHE_MAX_MB = 100
+
+# Streamed chunks are small, so a larger file buffer means fewer write syscalls
+TTS_WRITE_BUFFER = 64 * 1024
+
+TTS_MODEL_ID = "eleven_turbo_v2_5"  # Fast, high-quality model
+
+# Output formats by playback quality; lower bitrates mean fewer bytes to transfer and store
+QUALITY_PRESETS = {
+    "low": "mp3_22050_32",
+    "hi": "mp3_44100_128",
+    "phone": "ulaw_8000"
+}
+DEFAULT_OUTPUT_FORMAT = QUALITY_PRESETS["low"]
+
+# In-progress cache writes; everything else in TTS_CACHE_DIR is a cached clip
+TTS_TEMP_SUFFIX = ".part"
+
+
+def _tts_cache_key(text: str, voice_id: str, stability: float, similarity_boost: float,
+                   style: float, model_id: str, output_format: str) -> str:
+    """Cache file name: a hash of everything that affects the audio, plus the codec's extension"""
+    raw = f"{text}|{voice_id}|{stability}|{similarity_boost}|{style}|{model_id}|{output_format}"
+    codec = output_format.split("_", 1)[0]  # e.g. "mp3_22050_32" -> "mp3", "ulaw_8000" -> "ulaw"
+    return f"{hashlib.sha256(raw.encode('utf-8')).hexdigest()}.{codec}"
+
+
+def _tts_cache_path(key: str) -> str:
+    """Location of a cached audio file"""
+    return os.path.join(TTS_CACHE_DIR, key)
+
+
+def _tts_cache_commit(temp_path: str, key: str):
+    """Atomically move a finished temp file into the cache, then enforce the size limit"""
+    os.replace(temp_path, _tts_cache_path(key))
+    _evict_tts_cache()
+
+
+def _tts_cache_temp() -> Tuple[int, str]:
+    """Create a temp file inside the cache dir (same filesystem, so rename is atomic)"""
+    os.makedirs(TTS_CACHE_DIR, exist_ok=True)
+    return tempfile.mkstemp(dir=TTS_CACHE_DIR, suffix=TTS_TEMP_SUFFIX)
+
+
+def _tts_cache_store_bytes(key: str, audio_bytes: bytes):
+    """Add in-memory audio to the cache"""
+    try:
+        fd, temp_path = _tts_cache_temp()
+        with os.fdopen(fd, "wb") as f:
+            f.write(audio_bytes)
+        _tts_cache_commit(temp_path, key)
+    except OSError as e:
+        print(f"Warning: could not cache voice audio: {e}")
+
+
+def _tts_cache_store_file(key: str, path: str):
+    """Add an audio file to the cache"""
+    try:
+        fd, temp_path = _tts_cache_temp()
+        os.close(fd)
+        shutil.copyfile(path, temp_path)
+        _tts_cache_commit(temp_path, key)
+    except OSError as e:
+        print(f"Warning: could not cache voice audio: {e}")
+
+
+def _tee_to_cache(chunks: Iterator[bytes], key: str) -> Iterator[bytes]:
+    """Yield chunks while writing them to the cache; only complete audio is committed"""
+    try:
+        fd, temp_path = _tts_cache_temp()
+    except OSError as e:
+        print(f"Warning: could not cache voice audio: {e}")
+        yield from chunks
+        return
+
+    try:
+        with os.fdopen(fd, "wb", buffering=TTS_WRITE_BUFFER) as f:
+            for chunk in chunks:
+                f.write(chunk)
+                yield chunk
+        _tts_cache_commit(temp_path, key)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+def _evict_tts_cache():
+    """Remove least recently used cache files until the cache fits in TTS_CACHE_MAX_MB"""
+    entries = [
+        entry for entry in os.scandir(TTS_CACHE_DIR)
+        if entry.is_file() and not entry.name.endswith(TTS_TEMP_SUFFIX)
+    ]
+    stats = {entry.path: entry.stat() for entry in entries}
+    total = sum(st.st_size for st in stats.values())
+    limit = TTS_CACHE_MAX_MB * 1024 * 1024
+    if total <= limit:
+        return
+    for path in sorted(stats, key=lambda path: stats[path].st_atime):
+        os.remove(path)
+        total -= stats[path].st_size
+        if total <= limit:
+            break
+
+
+def _notify_first_chunk(chunks: Iterator[bytes], callback: Callable[[bytes], None]) -> Iterator[bytes]:
+    """Pass chunks through, calling callback with the first non-empty one"""
+    notified = False
+    for chunk in chunks:
+        if chunk and not notified:
+            callback(chunk)
+            notified = True
+        yield chunk
+
+
+def _prepare_voice_request(
+    text: str,
+    mode: str,
+    optimize_streaming_latency: int,
+    output_format: str = DEFAULT_OUTPUT_FORMAT
+) -> Tuple[Dict, str]:
+    """Build the ElevenLabs request arguments and cache key for a mode's voice"""
+    # Get voice settings for this personality
+    voice = _PERSONALITY.get(mode)
+    if voice is None:
+        print(f"Warning: No voice mapping for mode '{mode}', using default")
+        voice = _PERSONALITY["🤔 Socratic Student"]
+    voice_id, settings = voice
+
+    cache_key = _tts_cache_key(
+        text,
+        voice_id,
+        settings.stability,
+        settings.similarity_boost,
+        settings.style,
+        TTS_MODEL_ID,
+        output_format
+    )
+
+    request = {
+        "voice_id": voice_id,
+        "optimize_streaming_latency": optimize_streaming_latency,
+        "output_format": output_format,
+        "text": text,
+        "model_id": TTS_MODEL_ID,
+        "voice_settings": settings
+    }
+    return request, cache_key
+
 
 def generate_voice_response(
     text: str,
     mode: str,
-    output_path: Optional[str] = None
-) -> Optional[bytes]:
+    output_path: Optional[str] = None,
+    stream: bool = False,
+    optimize_streaming_latency: int = 3,
+    on_first_chunk: Optional[Callable[[bytes], None]] = None,
+    output_format: str = DEFAULT_OUTPUT_FORMAT
+) -> Union[bytes, str, Iterator[bytes], None]:
     """
     Generate voice audio for AI student response
 
     Args:
         text: The text to convert to speech
         mode: AI student personality mode
-        output_path: Optional path to save audio file
+        output_path: Optional path to save audio file. Chunks are written to
+            the file as they arrive instead of being collected in memory.
+        stream: Return an iterator over audio chunks (e.g. to pipe into a
+            player) instead of waiting for the full audio
+        optimize_streaming_latency: ElevenLabs latency optimization level
+            (0 = none, 3 = max, 4 = max without text normalization)
+        on_first_chunk: Optional callback invoked with the first audio chunk,
+            e.g. to start playback as soon as audio is available
+        output_format: ElevenLabs output format (see QUALITY_PRESETS)
 
     Returns:
-        Audio bytes if successful, None if error
+        Iterator of audio chunks if stream is True, output_path if the audio
+        was saved to a file, otherwise the audio bytes. None if error.
     """
     try:
+        request, cache_key = _prepare_voice_request(text, mode, optimize_streaming_latency, output_format)
+
+        # Serve repeated utterances from the local cache
+        cache_path = _tts_cache_path(cache_key)
+        if os.path.exists(cache_path):
+            os.utime(cache_path)  # Mark as recently used (atime isn't updated on every mount)
+            if output_path:
+                shutil.copyfile(cache_path, output_path)
+                return output_path
+            with open(cache_path, "rb") as f:
+                audio_bytes = f.read()
+            if on_first_chunk:
+                on_first_chunk(audio_bytes)
+            return iter([audio_bytes]) if stream else audio_bytes
+
         client = get_elevenlabs_client()
 
-        # Get voice settings for this personality
-        personality = VOICE_PERSONALITIES.get(mode)
-        if not personality:
-            print(f"Warning: No voice mapping for mode '{mode}', using default")
-            personality = VOICE_PERSONALITIES["🤔 Socratic Student"]
-
-        # Generate speech with ElevenLabs
-        response = client.text_to_speech.convert(
-            voice_id=personality["voice_id"],
-            optimize_streaming_latency="0",
-            output_format="mp3_22050_32",
-            text=text,
-            model_id="eleven_turbo_v2_5",  # Fast, high-quality model
-            voice_settings=VoiceSettings(
-                stability=personality["stability"],
-                similarity_boost=personality["similarity_boost"],
-                style=personality.get("style", 0.5),
-                use_speaker_boost=True
-            )
-        )
+        # Generate speech with ElevenLabs' streaming endpoint so the first
+        # MP3 frames arrive while synthesis continues server-side
+        response = client.text_to_speech.stream(**request)
 
-        # Collect audio bytes
-        audio_bytes = b""
-        for chunk in response:
-            if chunk:
-                audio_bytes += chunk
+        if on_first_chunk:
+            response = _notify_first_chunk(response, on_first_chunk)
 
-        # Optionally save to file
+        # Hand chunks to the caller as they arrive (cached once fully consumed)
+        if stream:
+            return _tee_to_cache(response, cache_key)
+
+        # Write chunks straight to disk so nothing accumulates in memory
         if output_path:
-            with open(output_path, "wb") as f:
-                f.write(audio_bytes)
+            with open(output_path, "wb", buffering=TTS_WRITE_BUFFER) as f:
+                f.writelines(response)
+                size = f.tell()
+            if not size:
+                return None
+            _tts_cache_store_file(cache_key, output_path)
+            return output_path
+
+        # Collect audio bytes (one join instead of re-copying on every chunk)
+        audio_bytes = b"".join(response)
 
+        if audio_bytes:
+            _tts_cache_store_bytes(cache_key, audio_bytes)
         return audio_bytes
 
     except Exception as e:
@@ -109,10 +375,245 @@ def generate_voice_response(
         return None
 
 
+async def agenerate_voice_response(
+    text: str,
+    mode: str,
+    output_path: Optional[str] = None,
+    optimize_streaming_latency: int = 3,
+    output_format: str = DEFAULT_OUTPUT_FORMAT
+) -> Union[bytes, str, None]:
+    """
+    Generate voice audio without blocking the event loop
+
+    Async counterpart of generate_voice_response, sharing its cache.
+
+    Args:
+        text: The text to convert to speech
+        mode: AI student personality mode
+        output_path: Optional path to save audio file
+        optimize_streaming_latency: ElevenLabs latency optimization level
+        output_format: ElevenLabs output format (see QUALITY_PRESETS)
+
+    Returns:
+        output_path if the audio was saved to a file, otherwise the audio
+        bytes. None if error.
+    """
+    try:
+        request, cache_key = _prepare_voice_request(text, mode, optimize_streaming_latency, output_format)
+
+        # Serve repeated utterances from the local cache
+        cache_path = _tts_cache_path(cache_key)
+        if os.path.exists(cache_path):
+            os.utime(cache_path)
+            if output_path:
+                await asyncio.to_thread(shutil.copyfile, cache_path, output_path)
+                return output_path
+            return await asyncio.to_thread(_read_file, cache_path)
+
+        aclient = get_async_elevenlabs_client()
+        chunks = [chunk async for chunk in aclient.text_to_speech.stream(**request)]
+        audio_bytes = b"".join(chunks)
+        if not audio_bytes:
+            return None
+
+        # Disk writes happen off the event loop
+        await asyncio.to_thread(_tts_cache_store_bytes, cache_key, audio_bytes)
+        if output_path:
+            await asyncio.to_thread(_write_file, output_path, audio_bytes)
+            return output_path
+        return audio_bytes
+
+    except Exception as e:
+        print(f"Error generating voice: {e}")
+        return None
+
+
+# Sentence buffering for progressive playback
+SENTENCE_ABBREVIATIONS = {"dr.", "mr.", "mrs.", "ms.", "pm.", "am.", "e.g.", "i.e.", "etc.", "vs."}
+MIN_SENTENCE_CHARS = 10
+TTS_MAX_CONCURRENCY = 3
+
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?])\s+")
+
+
+def _split_sentences(text: str) -> List[str]:
+    """
+    Split text into sentences for per-sentence synthesis
+
+    Breaks on ./!/? followed by whitespace, skips common abbreviations,
+    merges fragments shorter than MIN_SENTENCE_CHARS into the next sentence,
+    and flushes whatever is left at the end.
+
+    Args:
+        text: The text to split
+
+    Returns:
+        List of sentences in order
+    """
+    sentences = []
+    buffer = ""
+    for piece in _SENTENCE_END_RE.split(text.strip()):
+        if not piece:
+            continue
+        buffer = f"{buffer} {piece}" if buffer else piece
+        last_word = buffer.rsplit(None, 1)[-1].lower()
+        if last_word in SENTENCE_ABBREVIATIONS or len(buffer) < MIN_SENTENCE_CHARS:
+            continue
+        sentences.append(buffer)
+        buffer = ""
+    if buffer:
+        sentences.append(buffer)
+    return sentences
+
+
+async def generate_voice_response_streamed(
+    text: str,
+    mode: str,
+    optimize_streaming_latency: int = 3,
+    output_format: str = DEFAULT_OUTPUT_FORMAT
+) -> AsyncIterator[bytes]:
+    """
+    Synthesize text sentence by sentence, yielding audio in order
+
+    All sentences are requested concurrently (at most TTS_MAX_CONCURRENCY
+    at a time), so the first audio arrives after roughly one sentence's
+    synthesis time instead of the full reply's.
+
+    Args:
+        text: The text to convert to speech
+        mode: AI student personality mode
+        optimize_streaming_latency: ElevenLabs latency optimization level
+        output_format: ElevenLabs output format (see QUALITY_PRESETS)
+
+    Yields:
+        Audio bytes for each sentence, in sentence order
+    """
+    semaphore = asyncio.Semaphore(TTS_MAX_CONCURRENCY)
+
+    async def synthesize(sentence: str) -> Optional[bytes]:
+        async with semaphore:
+            return await agenerate_voice_response(
+                sentence,
+                mode,
+                optimize_streaming_latency=optimize_streaming_latency,
+                output_format=output_format
+            )
+
+    tasks = [asyncio.create_task(synthesize(sentence)) for sentence in _split_sentences(text)]
+    try:
+        # Await in index order: later sentences keep synthesizing while earlier ones are yielded
+        for task in tasks:
+            audio = await task
+            if audio:
+                yield audio
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+TTS_POOL_WORKERS = 4
+
+
+class TTSWorkerPool:
+    """
+    Worker coroutines that serve queued TTS requests
+
+    The pool runs on its own event loop thread, so the Gradio handlers (which
+    run on worker threads) can queue requests from any thread. All workers
+    share that loop's AsyncElevenLabs client, so requests from concurrent
+    users reuse the same keep-alive connections. A new request starts as
+    soon as any worker is free instead of waiting behind one particular
+    in-flight request.
+    """
+
+    def __init__(self, workers: int = TTS_POOL_WORKERS):
+        self.workers = workers
+        self.loop = asyncio.new_event_loop()
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        threading.Thread(target=self.loop.run_forever, name="tts-worker-pool", daemon=True).start()
+
+    def _start(self):
+        """Start the workers on the pool's event loop"""
+        self._queue = asyncio.Queue()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def _worker(self):
+        """Process queued requests until cancelled"""
+        while True:
+            future, text, mode, kwargs = await self._queue.get()
+            try:
+                if not future.done():
+                    result = await agenerate_voice_response(text, mode, **kwargs)
+                    if not future.done():
+                        future.set_result(result)
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+            finally:
+                self._queue.task_done()
+
+    async def _submit(self, text: str, mode: str, kwargs: Dict) -> Union[bytes, str, None]:
+        """Queue a request on the pool's loop and wait for its result"""
+        if not self._tasks:
+            self._start()
+        future = self.loop.create_future()
+        await self._queue.put((future, text, mode, kwargs))
+        return await future
+
+    def submit(self, text: str, mode: str, **kwargs) -> Future:
+        """
+        Queue a TTS request from any thread
+
+        Args:
+            text: The text to convert to speech
+            mode: AI student personality mode
+            **kwargs: Passed through to agenerate_voice_response
+
+        Returns:
+            concurrent.futures.Future resolving to agenerate_voice_response's
+            result; wrap it with asyncio.wrap_future() to await it
+        """
+        return asyncio.run_coroutine_threadsafe(self._submit(text, mode, kwargs), self.loop)
+
+
+# One pool per process, so every user's requests share its queue and client
+_tts_pool: Optional[TTSWorkerPool] = None
+_tts_pool_lock = threading.Lock()
+
+
+def get_tts_worker_pool() -> TTSWorkerPool:
+    """Get the shared TTS worker pool, starting it on first use"""
+    global _tts_pool
+    with _tts_pool_lock:
+        if _tts_pool is None:
+            _tts_pool = TTSWorkerPool()
+        return _tts_pool
+
+
+def _read_file(path: str) -> bytes:
+    """Read a whole file (helper for asyncio.to_thread)"""
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def _write_file(path: str, data: bytes):
+    """Write a whole file (helper for asyncio.to_thread)"""
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+def _tts_cached_file(text: str, mode: str, output_format: str) -> str:
+    """Path an utterance is stored under in the TTS cache"""
+    _, cache_key = _prepare_voice_request(text, mode, 0, output_format)
+    return _tts_cache_path(cache_key)
+
+
 def text_to_speech_file(
     text: str,
     mode: str,
-    output_filename: str = "response.mp3"
+    output_filename: Optional[str] = None,
+    output_format: str = DEFAULT_OUTPUT_FORMAT
 ) -> Optional[str]:
     """
     Generate voice audio and save to file
@@ -120,22 +621,58 @@ def text_to_speech_file(
     Args:
         text: The text to convert to speech
         mode: AI student personality mode
-        output_filename: Name of output file
+        output_filename: Name of output file. Defaults to the audio's file in
+            the TTS cache, so repeated requests reuse it and old clips are
+            evicted with the rest of the cache.
+        output_format: ElevenLabs output format (see QUALITY_PRESETS)
 
     Returns:
         Path to audio file if successful, None if error
     """
-    import tempfile
-    import os
+    if output_filename:
+        output_path = os.path.join(tempfile.gettempdir(), output_filename)
+        # Generate audio (streamed straight into the file)
+        return generate_voice_response(text, mode, output_path, output_format=output_format)
+
+    # Cache entries are renamed into place, so readers never see a partial file
+    cache_path = _tts_cached_file(text, mode, output_format)
+    if os.path.exists(cache_path):
+        os.utime(cache_path)  # Mark as recently used
+        return cache_path
+    # Queue on the shared worker pool so concurrent users share its connections
+    if not get_tts_worker_pool().submit(text, mode, output_format=output_format).result():
+        return None
+    return cache_path if os.path.exists(cache_path) else None
 
-    # Create temp file path
-    temp_dir = tempfile.gettempdir()
-    output_path = os.path.join(temp_dir, output_filename)
 
-    # Generate audio
-    audio_bytes = generate_voice_response(text, mode, output_path)
+async def atext_to_speech_file(
+    text: str,
+    mode: str,
+    output_filename: Optional[str] = None,
+    output_format: str = DEFAULT_OUTPUT_FORMAT
+) -> Optional[str]:
+    """
+    Generate voice audio and save to file without blocking the event loop
+
+    Args:
+        text: The text to convert to speech
+        mode: AI student personality mode
+        output_filename: Name of output file. Defaults to the audio's file in
+            the TTS cache, so repeated requests reuse it and old clips are
+            evicted with the rest of the cache.
+        output_format: ElevenLabs output format (see QUALITY_PRESETS)
+
+    Returns:
+        Path to audio file if successful, None if error
+    """
+    if output_filename:
+        output_path = os.path.join(tempfile.gettempdir(), output_filename)
+        return await agenerate_voice_response(text, mode, output_path, output_format=output_format)
 
-    if audio_bytes:
-        return output_path
-    else:
+    cache_path = _tts_cached_file(text, mode, output_format)
+    if os.path.exists(cache_path):
+        os.utime(cache_path)
+        return cache_path
+    if not await asyncio.wrap_future(get_tts_worker_pool().submit(text, mode, output_format=output_format)):
         return None
+    return cache_path if os.path.exists(cache_path) else None
@@ -5,6 +5,8 @@ This script tests if the background analytics trigger works correctly.
 """
 
 import os
+import time
+import asyncio
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -72,9 +74,11 @@ test_session = {
 print("\n[TEST] Spawning background analytics task...")
 print(f"       Session data: {len(test_session['analyses'])} analyses")
 
-try:
+
+async def trigger_analytics():
+    """Spawn the analytics task and await its result without blocking the event loop"""
     # Spawn the task (non-blocking)
-    call = compute_session_analytics.spawn(test_session)
+    call = await compute_session_analytics.spawn.aio(test_session)
     print(f"\n[OK] Task spawned successfully!")
     print(f"     Call ID: {call.object_id}")
 
@@ -83,7 +87,17 @@ try:
     print("       Dashboard: https://modal.com/apps")
 
     print("\n[TEST] Optionally waiting for result (this may take a few seconds)...")
-    result = call.get(timeout=30)
+    started = time.monotonic()
+    pending = asyncio.create_task(call.get.aio(timeout=30))
+    while True:
+        done, _ = await asyncio.wait({pending}, timeout=5)
+        if done:
+            return pending.result()
+        print(f"       ...still running ({time.monotonic() - started:.0f}s)")
+
+
+try:
+    result = asyncio.run(trigger_analytics())
 
     print(f"\n[OK] Task completed successfully!")
     print(f"     Result:")
@@ -3,18 +3,83 @@ Test script for TeachBack AI advanced features
 Run this to verify all features are working correctly
 """
 
+import io
+import os
 import sys
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
-def test_database():
+# Make the repo root importable when run as `python tests/test_features.py`
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.database.db_manager import DatabaseManager
+
+try:
+    import pytest
+except ImportError:  # Allow running as a plain script
+    pytest = None
+
+
+class ThreadBufferedOutput(io.TextIOBase):
+    """Stdout replacement that buffers each worker thread's output separately"""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self._local = threading.local()
+
+    def start(self):
+        """Start buffering output for the current thread"""
+        self._local.buffer = io.StringIO()
+
+    def finish(self) -> str:
+        """Stop buffering for the current thread and return what it wrote"""
+        buffer = self._local.buffer
+        self._local.buffer = None
+        return buffer.getvalue()
+
+    def write(self, text):
+        buffer = getattr(self._local, "buffer", None)
+        return (buffer or self.stream).write(text)
+
+    def flush(self):
+        self.stream.flush()
+
+
+# (test name, exception, traceback) for failed tests; formatted once all tests finish
+_errors = []
+
+
+def report_errors():
+    """Print the tracebacks collected from failed tests"""
+    for name, error, tb in _errors:
+        print(f"\n--- {name} traceback ---", file=sys.stderr)
+        traceback.print_exception(type(error), error, tb, file=sys.stderr)
+    _errors.clear()
+
+
+def create_test_db():
+    """Create the in-memory database shared by all feature tests"""
+    db = DatabaseManager(":memory:")
+    print("✓ Database initialized")
+    return db
+
+
+if pytest:
+    @pytest.fixture(scope="module")
+    def db():
+        """One in-memory database for the whole module"""
+        test_db = create_test_db()
+        yield test_db
+        test_db.cleanup()
+        report_errors()
+
+
+def test_database(db):
     """Test database operations"""
     print("\n=== Testing Database ===")
     try:
-        from src.database.db_manager import DatabaseManager
-
-        db = DatabaseManager("test_teachback.db")
-        print("✓ Database initialized")
-
         # Create user
         user = db.get_or_create_user("test_user", "Test User")
         print(f"✓ User created: {user.username}")
@@ -54,35 +119,79 @@ def test_database():
         stats = db.get_user_stats("test_user")
         print(f"✓ User stats retrieved: {stats['total_sessions']} sessions")
 
-        # Cleanup
-        db.cleanup()
-        print("✓ Database cleanup successful")
-
-        import os
-        if os.path.exists("test_teachback.db"):
-            os.remove("test_teachback.db")
-            print("✓ Test database removed")
-
         return True
 
     except Exception as e:
-        print(f"✗ Database test failed: {e}")
-        import traceback
-        traceback.print_exc()
+        print(f"✗ Database test failed: {e!r}")
+        _errors.append(("Database Operations", e, sys.exc_info()[2]))
         return False
 
 
-def test_knowledge_graph():
+def test_atomic_turn_write(db):
+    """Test writing a full teaching turn in one transaction"""
+    print("\n=== Testing Atomic Turn Write ===")
+    # No try/except: a failed assert must reach pytest (a returned False still passes)
+    from src.database.models import Analysis, Conversation, Session
+
+    db.get_or_create_user("test_user", "Test User")
+    db.create_session(
+        session_id="atomic_session_001",
+        user_id="test_user",
+        topic="Python Recursion",
+        mode="socratic"
+    )
+
+    db.write_turn_atomic(
+        session_id="atomic_session_001",
+        turn_number=2,
+        teacher_content="The base case stops the recursion.",
+        student_content="Why does it need to stop?",
+        analysis={
+            "confidence_score": 0.8,
+            "clarity_score": 0.85,
+            "knowledge_gaps": [],
+            "unexplained_jargon": [],
+            "strengths": ["Mentions base case"]
+        },
+        average_confidence=0.8,
+        average_clarity=0.85
+    )
+
+    # Read back inside a session; rows returned by the manager are detached
+    with db.session_scope() as session:
+        messages = [
+            (c.turn_number, c.role, c.content)
+            for c in session.query(Conversation).filter_by(session_id="atomic_session_001")
+            .order_by(Conversation.id)
+        ]
+        analyses = [
+            (a.turn_number, a.confidence_score, a.clarity_score, a.strengths)
+            for a in session.query(Analysis).filter_by(session_id="atomic_session_001")
+        ]
+        stored = session.query(Session).filter_by(id="atomic_session_001").first()
+        metrics = (stored.turn_count, stored.average_confidence, stored.average_clarity)
+
+    assert messages == [
+        (2, "teacher", "The base case stops the recursion."),
+        (2, "student", "Why does it need to stop?")
+    ], messages
+    assert analyses == [(2, 0.8, 0.85, ["Mentions base case"])], analyses
+    assert metrics == (2, 0.8, 0.85), metrics
+    print(f"✓ Turn written atomically: {len(messages)} messages, {len(analyses)} analysis")
+    print(f"✓ Session metrics updated: turn {metrics[0]}, confidence {metrics[1]}, clarity {metrics[2]}")
+
+    return True
+
+
+def test_knowledge_graph(db):
     """Test knowledge graph service"""
     print("\n=== Testing Knowledge Graph ===")
     try:
         from src.services.knowledge_graph import KnowledgeGraphService
-        from src.database.db_manager import DatabaseManager
 
         kg = KnowledgeGraphService()
         print("✓ Knowledge graph service initialized")
 
-        db = DatabaseManager("test_teachback.db")
         db.get_or_create_user("test_user", "Test User")
 
         # Create knowledge node
@@ -104,30 +213,20 @@ def test_knowledge_graph():
         html = kg.generate_graph_html(graph_data)
         print(f"✓ Graph HTML generated: {len(html)} characters")
 
-        # Cleanup
-        db.cleanup()
-        import os
-        if os.path.exists("test_teachback.db"):
-            os.remove("test_teachback.db")
-            print("✓ Test database removed")
-
         return True
 
     except Exception as e:
-        print(f"✗ Knowledge graph test failed: {e}")
-        import traceback
-        traceback.print_exc()
+        print(f"✗ Knowledge graph test failed: {e!r}")
+        _errors.append(("Knowledge Graph", e, sys.exc_info()[2]))
         return False
 
 
-def test_spaced_repetition():
+def test_spaced_repetition(db):
     """Test spaced repetition service"""
     print("\n=== Testing Spaced Repetition ===")
     try:
         from src.services.spaced_repetition import SpacedRepetitionService
-        from src.database.db_manager import DatabaseManager
 
-        db = DatabaseManager("test_teachback.db")
         db.get_or_create_user("test_user", "Test User")
 
         sr = SpacedRepetitionService(db)
@@ -158,23 +257,15 @@ def test_spaced_repetition():
         )
         print(f"✓ Quality calculation: {quality}/5")
 
-        # Cleanup
-        db.cleanup()
-        import os
-        if os.path.exists("test_teachback.db"):
-            os.remove("test_teachback.db")
-            print("✓ Test database removed")
-
         return True
 
     except Exception as e:
-        print(f"✗ Spaced repetition test failed: {e}")
-        import traceback
-        traceback.print_exc()
+        print(f"✗ Spaced repetition test failed: {e!r}")
+        _errors.append(("Spaced Repetition", e, sys.exc_info()[2]))
         return False
 
 
-def test_ui_handlers():
+def test_ui_handlers(db):
     """Test UI handler functions"""
     print("\n=== Testing UI Handlers ===")
     try:
@@ -184,9 +275,7 @@ def test_ui_handlers():
             view_knowledge_graph,
             view_spaced_repetition
         )
-        from src.database.db_manager import DatabaseManager
 
-        db = DatabaseManager("test_teachback.db")
         user = db.get_or_create_user("test_user", "Test User")
 
         # Create a test session
@@ -217,35 +306,116 @@ def test_ui_handlers():
         due, schedule = view_spaced_repetition("test_user")
         print(f"✓ Spaced repetition view: {len(due)} chars")
 
-        # Cleanup
-        db.cleanup()
-        import os
-        if os.path.exists("test_teachback.db"):
-            os.remove("test_teachback.db")
-            print("✓ Test database removed")
-
         return True
 
     except Exception as e:
-        print(f"✗ UI handlers test failed: {e}")
-        import traceback
-        traceback.print_exc()
+        print(f"✗ UI handlers test failed: {e!r}")
+        _errors.append(("UI Handlers", e, sys.exc_info()[2]))
         return False
 
 
+def test_voice_audio_path(db):
+    """Test that the handler's voice clip comes from the TTS pool and passes Gradio's file check"""
+    print("\n=== Testing Voice Audio Path ===")
+    # No try/except: a failed check must reach pytest (a returned False still passes)
+    from types import SimpleNamespace
+    from unittest.mock import patch
+
+    import gradio as gr
+    from gradio import processing_utils
+    from gradio.context import LocalContext
+
+    from src.utils import elevenlabs_client
+    from src.utils.elevenlabs_client import text_to_speech_file, QUALITY_PRESETS, DEFAULT_OUTPUT_FORMAT
+
+    # Stub ElevenLabs, recording which thread each request runs on
+    request_threads = []
+
+    async def fake_stream(**request):
+        request_threads.append(threading.current_thread().name)
+        yield b"\xff\xfb\x90\x00" * 64
+
+    client = SimpleNamespace(text_to_speech=SimpleNamespace(stream=fake_stream))
+
+    # Same call as submit_explanation
+    with patch.object(elevenlabs_client, "get_async_elevenlabs_client", return_value=client):
+        audio_path = text_to_speech_file(
+            text=f"Voice path check {datetime.now().isoformat()}",
+            mode="🤔 Socratic Student",
+            output_format=QUALITY_PRESETS.get("low", DEFAULT_OUTPUT_FORMAT)
+        )
+    assert audio_path, "text_to_speech_file returned no path"
+    # The request was served by the shared TTS worker pool
+    assert request_threads == ["tts-worker-pool"], request_threads
+
+    try:
+        audio = gr.Audio(type="filepath")
+        # A launched app with the same (empty) allowed_paths as app.launch()
+        launched = SimpleNamespace(has_launched=True, is_running=True, allowed_paths=[], blocked_paths=[])
+        token = LocalContext.blocks.set(launched)
+        try:
+            # Raises InvalidPathError if Gradio refuses to serve the file
+            served = processing_utils.move_files_to_cache(audio.postprocess(audio_path), audio, postprocess=True)
+        finally:
+            LocalContext.blocks.reset(token)
+    finally:
+        os.remove(audio_path)
+
+    assert served["url"], served
+    print(f"✓ Voice clip served by Gradio: {os.path.basename(audio_path)}")
+
+    return True
+
+
 def main():
     """Run all tests"""
     print("=" * 60)
     print("TeachBack AI - Feature Test Suite")
     print("=" * 60)
 
+    tests = [
+        ("Database Operations", test_database),
+        ("Atomic Turn Write", test_atomic_turn_write),
+        ("Knowledge Graph", test_knowledge_graph),
+        ("Spaced Repetition", test_spaced_repetition),
+        ("UI Handlers", test_ui_handlers),
+        ("Voice Audio Path", test_voice_audio_path),
+    ]
+
+    output = ThreadBufferedOutput(sys.stdout)
+
+    def run_isolated(test_fn):
+        # Each test gets its own in-memory database so they can run concurrently,
+        # and its own output buffer so its log is written in one piece
+        output.start()
+        db = create_test_db()
+        try:
+            result = test_fn(db)
+        except Exception as e:
+            # Tests that let failures propagate (so pytest sees them) are recorded here
+            print(f"✗ Test failed: {e!r}")
+            _errors.append((test_fn.__name__, e, sys.exc_info()[2]))
+            result = False
+        finally:
+            db.cleanup()
+        return result, output.finish()
+
+    # Run tests in parallel, reporting results in the original order
+    sys.stdout = output
+    try:
+        with ThreadPoolExecutor(max_workers=len(tests)) as executor:
+            futures = {executor.submit(run_isolated, fn): name for name, fn in tests}
+            outcomes = [(name, future.result()) for future, name in futures.items()]
+    finally:
+        sys.stdout = output.stream
+
     results = []
+    for name, (result, log) in outcomes:
+        sys.stdout.write(log)
+        results.append((name, result))
+    sys.stdout.flush()
 
-    # Run tests
-    results.append(("Database Operations", test_database()))
-    results.append(("Knowledge Graph", test_knowledge_graph()))
-    results.append(("Spaced Repetition", test_spaced_repetition()))
-    results.append(("UI Handlers", test_ui_handlers()))
+    report_errors()
 
     # Summary
     print("\n" + "=" * 60)
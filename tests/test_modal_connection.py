@@ -32,15 +32,16 @@ except ImportError as e:
 
 # Test looking up deployed functions
 print("\nAttempting to connect to deployed Modal functions...")
+from src.agents.teaching_agent import get_modal_function
 
 try:
-    compute_session_analytics = modal.Function.from_name("teachback-ai", "compute_session_analytics")
+    compute_session_analytics = get_modal_function("compute_session_analytics")
     print(f"[OK] Found compute_session_analytics: {compute_session_analytics}")
 except Exception as e:
     print(f"[FAIL] Failed to find compute_session_analytics: {e}")
 
 try:
-    parallel_analyze_and_question = modal.Function.from_name("teachback-ai", "parallel_analyze_and_question")
+    parallel_analyze_and_question = get_modal_function("parallel_analyze_and_question")
     print(f"[OK] Found parallel_analyze_and_question: {parallel_analyze_and_question}")
 except Exception as e:
     print(f"[FAIL] Failed to find parallel_analyze_and_question: {e}")
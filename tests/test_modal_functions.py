@@ -5,6 +5,7 @@ Test script to verify Modal functions are properly connected and working.
 import os
 import sys
 import io
+import asyncio
 
 # Fix encoding issues on Windows
 if sys.platform == 'win32':
@@ -41,78 +42,99 @@ else:
 
 # Test 3: Connect to deployed Modal functions
 print("\n[3/5] Connecting to deployed Modal functions...")
-try:
-    analyze_explanation_modal = modal.Function.from_name("teachback-ai", "analyze_explanation_modal")
-    print("  ✓ analyze_explanation_modal connected")
-except Exception as e:
-    print(f"  ✗ Failed to connect to analyze_explanation_modal: {e}")
-    analyze_explanation_modal = None
-
-try:
-    generate_question_modal = modal.Function.from_name("teachback-ai", "generate_question_modal")
-    print("  ✓ generate_question_modal connected")
-except Exception as e:
-    print(f"  ✗ Failed to connect to generate_question_modal: {e}")
-    generate_question_modal = None
-
-try:
-    compute_session_analytics = modal.Function.from_name("teachback-ai", "compute_session_analytics")
-    print("  ✓ compute_session_analytics connected")
-except Exception as e:
-    print(f"  ✗ Failed to connect to compute_session_analytics: {e}")
-    compute_session_analytics = None
-
-# Test 4: Test analyze_explanation_modal
-print("\n[4/5] Testing analyze_explanation_modal...")
-if analyze_explanation_modal:
-    try:
-        test_explanation = "A binary tree is a data structure where each node has at most two children."
-        test_topic = "Binary Trees"
-
-        print(f"  → Calling analyze_explanation_modal.remote()...")
-        result = analyze_explanation_modal.remote(
+# Handles are cached, so each function is looked up only once per process
+from src.agents.teaching_agent import get_modal_function
+
+FUNCTION_NAMES = ["analyze_explanation_modal", "generate_question_modal", "compute_session_analytics"]
+
+
+async def connect_functions():
+    """Look up all deployed functions concurrently"""
+    return await asyncio.gather(
+        *[asyncio.to_thread(get_modal_function, name) for name in FUNCTION_NAMES],
+        return_exceptions=True
+    )
+
+
+handles = {}
+for name, handle in zip(FUNCTION_NAMES, asyncio.run(connect_functions())):
+    if isinstance(handle, Exception):
+        print(f"  ✗ Failed to connect to {name}: {handle}")
+        handle = None
+    else:
+        print(f"  ✓ {name} connected")
+    handles[name] = handle
+
+analyze_explanation_modal = handles["analyze_explanation_modal"]
+generate_question_modal = handles["generate_question_modal"]
+compute_session_analytics = handles["compute_session_analytics"]
+
+# Tests 4 and 5 are independent, so both remote calls run at once
+test_explanation = "A binary tree is a data structure where each node has at most two children."
+test_topic = "Binary Trees"
+test_analysis = {
+    "confidence_score": 0.8,
+    "clarity_score": 0.7,
+    "knowledge_gaps": ["Didn't explain tree traversal"],
+    "unexplained_jargon": [],
+    "strengths": ["Clear definition"]
+}
+
+
+async def skipped():
+    """Placeholder for a function that is not connected"""
+    return None
+
+
+async def run_remote_calls():
+    """Call analyze_explanation_modal and generate_question_modal concurrently"""
+    if analyze_explanation_modal:
+        print(f"  → Calling analyze_explanation_modal.remote.aio()...")
+        analysis_call = analyze_explanation_modal.remote.aio(
             explanation=test_explanation,
             topic=test_topic
         )
+    else:
+        analysis_call = skipped()
 
-        print(f"  ✓ Analysis completed!")
-        print(f"    - Confidence score: {result.get('confidence_score', 'N/A')}")
-        print(f"    - Clarity score: {result.get('clarity_score', 'N/A')}")
-        print(f"    - Knowledge gaps: {len(result.get('knowledge_gaps', []))}")
-
-    except Exception as e:
-        print(f"  ✗ analyze_explanation_modal test failed: {e}")
-else:
-    print("  ⊘ Skipped (function not connected)")
-
-# Test 5: Test generate_question_modal
-print("\n[5/5] Testing generate_question_modal...")
-if generate_question_modal:
-    try:
-        test_analysis = {
-            "confidence_score": 0.8,
-            "clarity_score": 0.7,
-            "knowledge_gaps": ["Didn't explain tree traversal"],
-            "unexplained_jargon": [],
-            "strengths": ["Clear definition"]
-        }
-
-        print(f"  → Calling generate_question_modal.remote()...")
-        question = generate_question_modal.remote(
+    if generate_question_modal:
+        print(f"  → Calling generate_question_modal.remote.aio()...")
+        question_call = generate_question_modal.remote.aio(
             explanation=test_explanation,
             mode="socratic",
             analysis=test_analysis,
             topic=test_topic,
             conversation_history=[]
         )
+    else:
+        question_call = skipped()
 
-        print(f"  ✓ Question generated!")
-        print(f"    Question: \"{question}\"")
+    return await asyncio.gather(analysis_call, question_call, return_exceptions=True)
 
-    except Exception as e:
-        print(f"  ✗ generate_question_modal test failed: {e}")
+
+result, question = asyncio.run(run_remote_calls())
+
+# Test 4: Test analyze_explanation_modal
+print("\n[4/5] Testing analyze_explanation_modal...")
+if not analyze_explanation_modal:
+    print("  ⊘ Skipped (function not connected)")
+elif isinstance(result, Exception):
+    print(f"  ✗ analyze_explanation_modal test failed: {result}")
 else:
+    print(f"  ✓ Analysis completed!")
+    print(f"    - Confidence score: {result.get('confidence_score', 'N/A')}")
+    print(f"    - Clarity score: {result.get('clarity_score', 'N/A')}")
+    print(f"    - Knowledge gaps: {len(result.get('knowledge_gaps', []))}")
+
+# Test 5: Test generate_question_modal
+print("\n[5/5] Testing generate_question_modal...")
+if not generate_question_modal:
     print("  ⊘ Skipped (function not connected)")
+elif isinstance(question, Exception):
+    print(f"  ✗ generate_question_modal test failed: {question}")
+else:
+    print(f"  ✓ Question generated!")
+    print(f"    Question: \"{question}\"")
 
 # Summary
 print("\n" + "=" * 70)
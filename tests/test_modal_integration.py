@@ -9,64 +9,190 @@ Usage:
 """
 
 import unittest
+import asyncio
+import json
 import os
-import time
+from time import perf_counter_ns as _clock
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from types import SimpleNamespace
+from typing import Tuple
 from unittest.mock import patch, MagicMock
 
 
-class TestModalIntegration(unittest.TestCase):
+def _try_modal():
+    """Import the Modal functions once for the whole suite; None if Modal isn't installed"""
+    try:
+        from src.modal_functions.parallel_teaching import (
+            analyze_explanation_modal,
+            generate_question_modal,
+            parallel_analyze_and_question
+        )
+        from src.modal_functions.background_analytics import (
+            compute_session_analytics,
+            batch_analyze_sessions
+        )
+    except ImportError as e:
+        print(f"⚠️ Modal imports failed (expected if Modal not installed): {e}")
+        return None
+    return SimpleNamespace(
+        analyze_explanation_modal=analyze_explanation_modal,
+        generate_question_modal=generate_question_modal,
+        parallel_analyze_and_question=parallel_analyze_and_question,
+        compute_session_analytics=compute_session_analytics,
+        batch_analyze_sessions=batch_analyze_sessions
+    )
+
+
+_M = _try_modal()
+
+# CI_PERF_GATE=1 turns the printed timings into assertions so regressions fail the run
+PERF_GATE = os.getenv("CI_PERF_GATE") == "1"
+
+@dataclass(frozen=True)
+class AnalysisFixture:
+    """Canned analysis result; asdict() it at the API boundary"""
+    __slots__ = ("confidence_score", "clarity_score", "knowledge_gaps", "unexplained_jargon", "strengths")
+    confidence_score: float
+    clarity_score: float
+    knowledge_gaps: Tuple[str, ...]
+    unexplained_jargon: Tuple[str, ...]
+    strengths: Tuple[str, ...]
+
+
+@dataclass(frozen=True)
+class SessionFixture:
+    """Canned session history; asdict() it at the API boundary"""
+    __slots__ = ("topic", "mode", "conversation_history", "analyses")
+    topic: str
+    mode: str
+    conversation_history: Tuple[dict, ...]
+    analyses: Tuple[AnalysisFixture, ...]
+
+
+# Built once and shared read-only by every test
+_SESSION_FIXTURE = SessionFixture(
+    topic="Recursion in Python",
+    mode="socratic",
+    conversation_history=(),
+    analyses=(
+        AnalysisFixture(
+            confidence_score=0.7,
+            clarity_score=0.8,
+            knowledge_gaps=("Base case explanation",),
+            unexplained_jargon=("stack frame",),
+            strengths=("Clear definition",)
+        ),
+        AnalysisFixture(
+            confidence_score=0.8,
+            clarity_score=0.85,
+            knowledge_gaps=("Base case explanation",),
+            unexplained_jargon=(),
+            strengths=("Good examples", "Clear structure")
+        )
+    )
+)
+
+_BATCH_FIXTURES = (
+    _SESSION_FIXTURE,
+    SessionFixture(
+        topic="Binary Search",
+        mode="contrarian",
+        conversation_history=(),
+        analyses=(
+            AnalysisFixture(
+                confidence_score=0.6,
+                clarity_score=0.7,
+                knowledge_gaps=("Time complexity",),
+                unexplained_jargon=("O(log n)",),
+                strengths=("Good examples",)
+            ),
+        )
+    ),
+    SessionFixture(
+        topic="Graph Traversal",
+        mode="five-year-old",
+        conversation_history=(),
+        analyses=(
+            AnalysisFixture(
+                confidence_score=0.9,
+                clarity_score=0.85,
+                knowledge_gaps=(),
+                unexplained_jargon=(),
+                strengths=("Clear explanation", "Simple language")
+            ),
+        )
+    )
+)
+
+
+class TestModalIntegration(unittest.IsolatedAsyncioTestCase):
     """Test suite for Modal integration in TeachBack AI"""
 
+    @classmethod
+    def setUpClass(cls):
+        """Warm Modal; the shared agents are created on first use"""
+        from src.agents import teaching_agent
+
+        cls._agents = {}
+
+        # Pay the container cold start here so timed tests measure a warm container
+        if teaching_agent.MODAL_AVAILABLE:
+            teaching_agent.prewarm_modal_functions()
+            try:
+                warmup = teaching_agent.parallel_analyze_and_question.spawn(
+                    explanation="warmup",
+                    mode="socratic",
+                    topic="warmup"
+                )
+                warmup.get(timeout=60)
+                print("🔥 Modal containers warmed up")
+            except Exception as e:
+                print(f"⚠️ Modal warmup failed, timings may include cold start: {e}")
+
+    @classmethod
+    def shared_agent(cls, use_modal: bool):
+        """
+        TeachingAgent shared by the tests that call the real API.
+
+        Created on first use, so tests that skip or mock the client never need
+        ANTHROPIC_API_KEY. Callers clear the sessions they create.
+        """
+        agent = cls._agents.get(use_modal)
+        if agent is None:
+            from src.agents.teaching_agent import TeachingAgent
+            agent = cls._agents[use_modal] = TeachingAgent()
+            agent.use_modal = use_modal
+        return agent
+
     def setUp(self):
         """Set up test fixtures"""
         self.test_explanation = "Recursion is when a function calls itself."
         self.test_topic = "Recursion in Python"
         self.test_mode = "socratic"
-        self.test_session_history = {
-            "topic": self.test_topic,
-            "mode": self.test_mode,
-            "conversation_history": [],
-            "analyses": [
-                {
-                    "confidence_score": 0.7,
-                    "clarity_score": 0.8,
-                    "knowledge_gaps": ["Base case explanation"],
-                    "unexplained_jargon": ["stack frame"],
-                    "strengths": ["Clear definition"]
-                },
-                {
-                    "confidence_score": 0.8,
-                    "clarity_score": 0.85,
-                    "knowledge_gaps": ["Base case explanation"],
-                    "unexplained_jargon": [],
-                    "strengths": ["Good examples", "Clear structure"]
-                }
-            ]
-        }
+        self.test_session_history = _SESSION_FIXTURE
 
     def test_modal_availability(self):
         """Test that Modal imports work correctly"""
-        try:
-            from src.modal_functions.parallel_teaching import (
-                analyze_explanation_modal,
-                generate_question_modal,
-                parallel_analyze_and_question
-            )
-            from src.modal_functions.background_analytics import (
-                compute_session_analytics,
-                batch_analyze_sessions
-            )
-            print("✅ All Modal functions imported successfully")
-            self.assertTrue(True)
-        except ImportError as e:
-            print(f"⚠️ Modal imports failed (expected if Modal not installed): {e}")
+        if _M is None:
             self.skipTest("Modal not available")
 
-    @patch.dict(os.environ, {"USE_MODAL": "false"})
-    def test_fallback_behavior(self):
+        print("✅ All Modal functions imported successfully")
+        self.assertTrue(True)
+
+    @patch.dict(os.environ, {"USE_MODAL": "false", "ANTHROPIC_API_KEY": "test-key"})
+    @patch("src.agents.teaching_agent.MODAL_AVAILABLE", False)
+    @patch("src.agents.teaching_agent.Anthropic")
+    def test_fallback_behavior(self, mock_anthropic):
         """Test that local execution works when Modal is disabled"""
         from src.agents.teaching_agent import TeachingAgent
 
+        # Canned Claude reply so only the fallback decision is under test
+        canned = json.dumps(asdict(_SESSION_FIXTURE.analyses[0]))
+        client = mock_anthropic.return_value
+        client.messages.create.return_value = SimpleNamespace(content=[SimpleNamespace(text=canned)])
+
+        # Built inside the patched environment so USE_MODAL=false is what disables Modal
         agent = TeachingAgent()
         self.assertFalse(agent.use_modal)
 
@@ -78,12 +204,13 @@ class TestModalIntegration(unittest.TestCase):
         )
 
         # Test local analysis
-        start_time = time.time()
         analysis = agent.analyze_explanation(
             session_id=session["session_id"],
             explanation=self.test_explanation
         )
-        local_time = time.time() - start_time
+
+        # The local client answered the request
+        client.messages.create.assert_called_once()
 
         # Verify analysis structure
         self.assertIn("confidence_score", analysis)
@@ -92,41 +219,39 @@ class TestModalIntegration(unittest.TestCase):
         self.assertIn("unexplained_jargon", analysis)
         self.assertIn("strengths", analysis)
 
-        print(f"✅ Local execution completed in {local_time:.2f}s")
+        print("✅ Local execution completed")
 
-    @patch.dict(os.environ, {"USE_MODAL": "true"})
-    def test_modal_enabled_flag(self):
+    @patch.dict(os.environ, {"USE_MODAL": "true", "ANTHROPIC_API_KEY": "test-key"})
+    @patch("src.agents.teaching_agent.Anthropic")
+    def test_modal_enabled_flag(self, mock_anthropic):
         """Test that USE_MODAL environment variable is respected"""
         from src.agents.teaching_agent import TeachingAgent
 
         # Create agent with Modal enabled
         agent = TeachingAgent()
         self.assertTrue(agent.use_modal)
+        mock_anthropic.assert_called_once_with(api_key="test-key")
 
         print("✅ Modal flag correctly set from environment variable")
 
-    def test_parallel_execution_performance(self):
+    async def test_parallel_execution_performance(self):
         """
         Test that Modal parallel execution is faster than sequential.
 
         Note: This test requires Modal to be properly configured and will
         be skipped if Modal is not available.
         """
-        try:
-            from src.agents.teaching_agent import TeachingAgent
-            from src.modal_functions.parallel_teaching import MODAL_AVAILABLE
-        except ImportError:
+        if _M is None:
             self.skipTest("Modal not available")
 
+        from src.agents.teaching_agent import MODAL_AVAILABLE
         if not MODAL_AVAILABLE:
             self.skipTest("Modal functions not available")
 
-        # Create agent instances
-        agent_local = TeachingAgent()
-        agent_local.use_modal = False
-
-        agent_modal = TeachingAgent()
-        agent_modal.use_modal = True
+        agent_local = self.shared_agent(use_modal=False)
+        agent_modal = self.shared_agent(use_modal=True)
+        self.addCleanup(agent_local.sessions.clear)
+        self.addCleanup(agent_modal.sessions.clear)
 
         # Create test sessions
         session_local = agent_local.create_session(
@@ -141,30 +266,58 @@ class TestModalIntegration(unittest.TestCase):
             mode=self.test_mode
         )
 
-        # Test sequential execution
-        print("\n⏱️ Testing sequential execution...")
-        start_time = time.time()
-        analysis_local = agent_local.analyze_explanation(
-            session_id=session_local["session_id"],
-            explanation=self.test_explanation
-        )
-        question_local = agent_local.generate_question(
-            session_id=session_local["session_id"],
-            explanation=self.test_explanation,
-            analysis=analysis_local,
-            mode=self.test_mode
-        )
-        sequential_time = time.time() - start_time
-        print(f"✅ Sequential execution: {sequential_time:.2f}s")
+        def run_sequential():
+            analysis = agent_local.analyze_explanation(
+                session_id=session_local["session_id"],
+                explanation=self.test_explanation
+            )
+            return agent_local.generate_question(
+                session_id=session_local["session_id"],
+                explanation=self.test_explanation,
+                analysis=analysis,
+                mode=self.test_mode
+            )
+
+        # Timings are printed only once both runs are measured, so console
+        # output never lands between the two measurements
+        timings = []
+
+        def report_timings():
+            for label, seconds in timings:
+                print(f"✅ {label}: {seconds:.2f}s")
+
+        # Test sequential execution (on a worker thread so the event loop isn't blocked).
+        # analyze_explanation and generate_question use Modal whenever it is available,
+        # so Modal is switched off here to make the baseline truly local
+        print("\n⏱️ Testing sequential then Modal parallel execution...")
+        with patch("src.agents.teaching_agent.MODAL_AVAILABLE", False):
+            start_ns = _clock()
+            await asyncio.to_thread(run_sequential)
+            sequential_time = (_clock() - start_ns) / 1e9
+        timings.append(("Sequential execution", sequential_time))
 
         # Test Modal parallel execution
-        print("\n⚡ Testing Modal parallel execution...")
         try:
-            analysis_modal, question_modal, modal_time = agent_modal.analyze_and_question_parallel(
+            # Both Modal RPCs are awaited on the test's event loop rather than blocking it
+            analysis_modal, question_modal, modal_time = await agent_modal.analyze_and_question_parallel_async(
                 session_id=session_modal["session_id"],
                 explanation=self.test_explanation
             )
-            print(f"✅ Modal execution: {modal_time:.2f}s")
+            timings.append(("Modal execution", modal_time))
+
+        except Exception as e:
+            report_timings()
+            error_msg = str(e)
+            if "not been hydrated" in error_msg or "not running" in error_msg:
+                print(f"⚠️ Modal not deployed, execution fell back to local")
+                print("   Deploy Modal with: python deploy_modal.py")
+                # This is expected behavior, not a test failure
+            else:
+                print(f"⚠️ Modal execution failed: {e}")
+                print("This may be due to Modal not being deployed or configured")
+            self.skipTest(f"Modal not deployed: {error_msg[:100]}")
+        else:
+            report_timings()
 
             # Modal should be faster (or at least comparable)
             speedup = sequential_time / modal_time if modal_time > 0 else 0
@@ -178,26 +331,17 @@ class TestModalIntegration(unittest.TestCase):
             else:
                 print("⚠️ Modal not faster (may be cold start or network latency)")
 
-        except Exception as e:
-            error_msg = str(e)
-            if "not been hydrated" in error_msg or "not running" in error_msg:
-                print(f"⚠️ Modal not deployed, execution fell back to local")
-                print("   Deploy Modal with: python deploy_modal.py")
-                # This is expected behavior, not a test failure
-            else:
-                print(f"⚠️ Modal execution failed: {e}")
-                print("This may be due to Modal not being deployed or configured")
-            self.skipTest(f"Modal not deployed: {error_msg[:100]}")
+            # Cold start is paid in setUpClass, so this measures warm containers
+            if PERF_GATE:
+                self.assertGreaterEqual(speedup, 1.5, f"Modal speedup regressed: {speedup:.2f}x")
 
     def test_background_analytics(self):
         """Test background analytics computation"""
-        try:
-            from src.modal_functions.background_analytics import compute_session_analytics
-        except ImportError:
+        if _M is None:
             self.skipTest("Modal not available")
 
         # Test local computation (without Modal deploy)
-        result = compute_session_analytics.local(self.test_session_history)
+        result = _M.compute_session_analytics.local(asdict(self.test_session_history))
 
         # Verify analytics structure
         self.assertIn("learning_curve", result)
@@ -221,62 +365,28 @@ class TestModalIntegration(unittest.TestCase):
 
     def test_batch_session_processing(self):
         """Test batch processing of multiple sessions"""
-        try:
-            from src.modal_functions.background_analytics import (
-                batch_analyze_sessions,
-                compute_session_analytics
-            )
-        except ImportError:
+        if _M is None:
             self.skipTest("Modal not available")
 
         # Create multiple test sessions
-        sessions = [
-            self.test_session_history,
-            {
-                "topic": "Binary Search",
-                "mode": "contrarian",
-                "conversation_history": [],
-                "analyses": [
-                    {
-                        "confidence_score": 0.6,
-                        "clarity_score": 0.7,
-                        "knowledge_gaps": ["Time complexity"],
-                        "unexplained_jargon": ["O(log n)"],
-                        "strengths": ["Good examples"]
-                    }
-                ]
-            },
-            {
-                "topic": "Graph Traversal",
-                "mode": "five-year-old",
-                "conversation_history": [],
-                "analyses": [
-                    {
-                        "confidence_score": 0.9,
-                        "clarity_score": 0.85,
-                        "knowledge_gaps": [],
-                        "unexplained_jargon": [],
-                        "strengths": ["Clear explanation", "Simple language"]
-                    }
-                ]
-            }
-        ]
+        sessions = [asdict(fixture) for fixture in _BATCH_FIXTURES]
 
         # Test batch processing
         print("\n📦 Testing batch session processing...")
 
         try:
-            # Try Modal .map() first
-            start_time = time.time()
-            results = list(batch_analyze_sessions.map(sessions))
-            batch_time = time.time() - start_time
-
-            # Verify results
-            self.assertEqual(len(results), 3)
-            for result in results:
+            # Try Modal .map() first, checking each result as its session finishes
+            start_ns = _clock()
+            results = []
+            for result in _M.compute_session_analytics.map(sessions, order_outputs=False):
                 self.assertIn("total_turns", result)
                 self.assertIn("average_confidence", result)
                 self.assertIn("average_clarity", result)
+                results.append(result)
+            batch_time = (_clock() - start_ns) / 1e9
+
+            # Verify results
+            self.assertEqual(len(results), 3)
 
             print(f"✅ Modal batch processing completed in {batch_time:.2f}s")
             print(f"   Processed {len(results)} sessions")
@@ -286,9 +396,10 @@ class TestModalIntegration(unittest.TestCase):
             # Fall back to local processing if Modal not deployed
             if "not been hydrated" in str(e) or "not running" in str(e):
                 print("⚠️ Modal not deployed, testing local batch processing...")
-                start_time = time.time()
-                results = [compute_session_analytics.local(s) for s in sessions]
-                batch_time = time.time() - start_time
+                start_ns = _clock()
+                with ThreadPoolExecutor(max_workers=min(len(sessions), os.cpu_count() or 1)) as executor:
+                    results = list(executor.map(_M.compute_session_analytics.local, sessions))
+                batch_time = (_clock() - start_ns) / 1e9
 
                 # Verify results
                 self.assertEqual(len(results), 3)
@@ -303,19 +414,44 @@ class TestModalIntegration(unittest.TestCase):
             else:
                 raise
 
-    @patch.dict(os.environ, {"USE_MODAL": "true"})
-    def test_trigger_background_analytics(self):
-        """Test triggering background analytics from TeachingAgent"""
-        try:
-            from src.agents.teaching_agent import TeachingAgent, MODAL_AVAILABLE
-        except ImportError:
+        if PERF_GATE:
+            per_session = batch_time / len(sessions)
+            self.assertLess(per_session, 2.0, f"Batch analytics regressed: {per_session:.2f}s per session")
+
+    def test_batch_analyze_sessions(self):
+        """Test that batch_analyze_sessions returns one analytics result per session, in order"""
+        if _M is None:
             self.skipTest("Modal not available")
 
-        if not MODAL_AVAILABLE:
-            self.skipTest("Modal functions not available")
+        sessions = [asdict(fixture) for fixture in _BATCH_FIXTURES]
+
+        # Run the per-session function in-process instead of fanning out to Modal
+        local_analytics = SimpleNamespace(
+            map=lambda items: map(_M.compute_session_analytics.local, items)
+        )
+        with patch("src.modal_functions.background_analytics.compute_session_analytics", local_analytics):
+            results = _M.batch_analyze_sessions.local(sessions)
+
+        self.assertEqual(len(results), len(sessions))
+        for session, result in zip(sessions, results):
+            self.assertEqual(result["total_turns"], len(session["analyses"]))
+            self.assertIn("average_confidence", result)
+            self.assertIn("average_clarity", result)
+
+        print(f"✅ batch_analyze_sessions processed {len(results)} sessions")
+
+    @patch.dict(os.environ, {"USE_MODAL": "true", "ANTHROPIC_API_KEY": "test-key"})
+    @patch("src.agents.teaching_agent.MODAL_AVAILABLE", True)
+    @patch("src.agents.teaching_agent.compute_session_analytics")
+    @patch("src.agents.teaching_agent.Anthropic")
+    def test_trigger_background_analytics(self, mock_anthropic, mock_analytics):
+        """Test triggering background analytics from TeachingAgent"""
+        from src.agents.teaching_agent import TeachingAgent
+
+        mock_analytics.spawn.return_value = SimpleNamespace(object_id="fc-test")
 
         agent = TeachingAgent()
-        agent.use_modal = True
+        self.assertTrue(agent.use_modal)
 
         # Create test session
         session = agent.create_session(
@@ -325,16 +461,19 @@ class TestModalIntegration(unittest.TestCase):
         )
 
         # Add some analyses to the session
-        agent.sessions[session["session_id"]]["analyses"] = self.test_session_history["analyses"]
+        session_data = agent.sessions[session["session_id"]]
+        session_data["analyses"] = [
+            asdict(analysis) for analysis in self.test_session_history.analyses
+        ]
 
         # Trigger background analytics
         print("\n📊 Testing background analytics trigger...")
         call_id = agent.trigger_background_analytics(session["session_id"])
 
-        if call_id:
-            print(f"✅ Background analytics spawned (call_id: {call_id})")
-        else:
-            print("⚠️ Background analytics not spawned (Modal may not be deployed)")
+        # The session was handed to Modal without blocking on the result
+        self.assertEqual(call_id, "fc-test")
+        mock_analytics.spawn.assert_called_once_with(session_data)
+        print(f"✅ Background analytics spawned (call_id: {call_id})")
 
     def test_import_structure(self):
         """Test that all imports resolve correctly"""
@@ -376,10 +515,13 @@ class TestModalIntegration(unittest.TestCase):
             self.fail(f"TeachingAgent import failed: {e}")
 
 
-def run_performance_comparison():
+async def run_performance_comparison():
     """
     Run a detailed performance comparison between sequential and Modal execution.
-    This is a standalone function that can be called separately.
+    This is a standalone coroutine that can be run separately with asyncio.run().
+
+    The test cases are independent, so all sequential baselines run together on
+    a thread pool, then all Modal runs are awaited together.
     """
     print("\n" + "="*60)
     print("🚀 Modal Performance Comparison")
@@ -395,6 +537,15 @@ def run_performance_comparison():
         print("\nThis will compare sequential vs Modal parallel execution.")
         print("Note: First run may be slower due to cold start.\n")
 
+        total_start_ns = _clock()
+
+        # One agent per execution mode, shared by every test case
+        agent_seq = TeachingAgent()
+        agent_seq.use_modal = False
+
+        agent_modal = TeachingAgent()
+        agent_modal.use_modal = True
+
         # Test scenarios
         test_cases = [
             ("Simple concept", "Variables store data in memory"),
@@ -402,33 +553,43 @@ def run_performance_comparison():
             ("Technical explanation", "REST APIs use HTTP methods like GET, POST, PUT, DELETE to perform CRUD operations on resources")
         ]
 
-        for idx, (name, explanation) in enumerate(test_cases, 1):
+        # Create sessions up front so worker threads never add to the sessions dict
+        seq_sessions = [agent_seq.create_session("test_user", "Programming", "socratic")["session_id"] for _ in test_cases]
+        modal_sessions = [agent_modal.create_session("test_user", "Programming", "socratic")["session_id"] for _ in test_cases]
+
+        def timed_sequential(session_id, explanation):
+            start_ns = _clock()
+            agent_seq.analyze_explanation(session_id, explanation)
+            return (_clock() - start_ns) / 1e9
+
+        # Sequential baselines: analyze_explanation blocks, so overlap them on threads.
+        # It uses Modal whenever it is available, so switch Modal off for a local baseline
+        loop = asyncio.get_running_loop()
+        with patch("src.agents.teaching_agent.MODAL_AVAILABLE", False), \
+                ThreadPoolExecutor(max_workers=len(test_cases)) as executor:
+            seq_times = await asyncio.gather(*[
+                loop.run_in_executor(executor, timed_sequential, session_id, explanation)
+                for session_id, (name, explanation) in zip(seq_sessions, test_cases)
+            ])
+
+        # Modal runs: awaited concurrently on the event loop
+        modal_results = await asyncio.gather(*[
+            agent_modal.analyze_and_question_parallel_async(session_id, explanation)
+            for session_id, (name, explanation) in zip(modal_sessions, test_cases)
+        ])
+
+        for idx, ((name, explanation), seq_time, (_, _, modal_time)) in enumerate(
+            zip(test_cases, seq_times, modal_results), 1
+        ):
             print(f"\n📝 Test Case {idx}: {name}")
             print("-" * 60)
 
-            # Sequential test
-            agent_seq = TeachingAgent()
-            agent_seq.use_modal = False
-            session_seq = agent_seq.create_session("test_user", "Programming", "socratic")
-
-            start = time.time()
-            agent_seq.analyze_explanation(session_seq["session_id"], explanation)
-            seq_time = time.time() - start
-
-            # Modal test
-            agent_modal = TeachingAgent()
-            agent_modal.use_modal = True
-            session_modal = agent_modal.create_session("test_user", "Programming", "socratic")
-
-            start = time.time()
-            agent_modal.analyze_and_question_parallel(session_modal["session_id"], explanation)
-            modal_time = time.time() - start
-
             speedup = seq_time / modal_time if modal_time > 0 else 0
             print(f"   Sequential: {seq_time:.2f}s")
             print(f"   Modal:      {modal_time:.2f}s")
             print(f"   Speedup:    {speedup:.2f}x")
 
+        print(f"\n   Total wall-clock: {(_clock() - total_start_ns) / 1e9:.2f}s")
         print("\n" + "="*60)
 
     except Exception as e:
@@ -444,4 +605,4 @@ if __name__ == "__main__":
 
     # Optional: Run detailed performance comparison
     # Uncomment the following line to run performance tests
-    # run_performance_comparison()
+    # asyncio.run(run_performance_comparison())
@@ -1,10 +1,18 @@
 """
 Test to reproduce the "stops after turn 5" issue
+
+Usage:
+    python tests/test_turn_5_issue.py
 """
 
 import os
 import sys
 import io
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from types import SimpleNamespace
+from unittest.mock import patch
 
 # Fix encoding issues on Windows
 if sys.platform == 'win32':
@@ -13,101 +21,209 @@ if sys.platform == 'win32':
 from dotenv import load_dotenv
 load_dotenv()
 
-print("=" * 70)
-print("TURN 5 ISSUE DEBUGGING TEST")
-print("=" * 70)
-
-# Import the TeachingAgent
-from src.agents.teaching_agent import TeachingAgent, MODAL_AVAILABLE, compute_session_analytics
-
-print(f"\n[INFO] MODAL_AVAILABLE: {MODAL_AVAILABLE}")
-print(f"[INFO] compute_session_analytics: {compute_session_analytics}")
-
-# Create a teaching agent
-print("\n[TEST] Creating TeachingAgent and simulating 6 turns...")
-agent = TeachingAgent()
-
-# Create a test session
-session = agent.create_session(
-    user_id="test-user",
-    topic="Binary Trees",
-    mode="socratic"
-)
-session_id = session["session_id"]
-print(f"✓ Session created: {session_id}")
-
-# Simulate 6 turns
-test_explanations = [
+# Explanations for each turn, plus (char count, word count) computed once up front
+EXPLANATIONS = (
     "A binary tree is a hierarchical data structure.",
     "Each node in a binary tree has at most two children.",
     "The children are called left child and right child.",
     "Binary trees are used for efficient searching.",
     "The root is the topmost node in the tree.",  # Turn 5 - analytics should trigger
-    "Traversal methods include inorder, preorder, and postorder."  # Turn 6 - should this work?
-]
-
-for i, explanation in enumerate(test_explanations, 1):
-    print(f"\n{'='*70}")
-    print(f"TURN {i}")
-    print(f"{'='*70}")
-
-    try:
-        # Step 1: Analyze
-        print(f"\n[{i}/6] Analyzing explanation...")
-        analysis = agent.analyze_explanation(
-            session_id=session_id,
-            explanation=explanation
-        )
-        print(f"✓ Analysis complete: confidence={analysis['confidence_score']}, clarity={analysis['clarity_score']}")
-
-        # Step 2: Generate question
-        print(f"\n[{i}/6] Generating question...")
-        question = agent.generate_question(
-            session_id=session_id,
-            explanation=explanation,
-            analysis=analysis,
-            mode="socratic"
+    "Traversal methods include inorder, preorder, and postorder.",  # Turn 6 - should this work?
+)
+EXPL_META = tuple((len(e), e.count(' ') + 1) for e in EXPLANATIONS)
+
+# Turns before the analytics spawn can be analyzed in one batch; from turn 5 on
+# every turn goes through the agent so a failure after the spawn shows up
+PRE_SPAWN_TURNS = 4
+
+# TURN_LOOP_CASSETTE=true records the Anthropic traffic on the first run and
+# replays it afterwards. Modal is bypassed so every call goes through the local
+# client, and analytics spawns return a stub call instead of hitting Modal.
+USE_CASSETTE = os.getenv("TURN_LOOP_CASSETTE", "false").lower() == "true"
+
+
+def _track_remote(fn, name, succeeded):
+    """Stand-in for a Modal function that records each .remote() call that returned"""
+    if fn is None:
+        return None
+
+    def remote(*args, **kwargs):
+        result = fn.remote(*args, **kwargs)
+        succeeded.append(name)
+        return result
+
+    return SimpleNamespace(remote=remote)
+
+
+def main():
+    """Run 6 turns on one session and report whether turn 6 still used Modal"""
+    print("=" * 70)
+    print("TURN 5 ISSUE DEBUGGING TEST")
+    print("=" * 70)
+
+    # Import the TeachingAgent
+    from src.agents.teaching_agent import (
+        TeachingAgent,
+        MODAL_AVAILABLE,
+        compute_session_analytics,
+        analyze_explanation_modal,
+        generate_question_modal
+    )
+
+    print(f"\n[INFO] MODAL_AVAILABLE: {MODAL_AVAILABLE}")
+    print(f"[INFO] compute_session_analytics: {compute_session_analytics}")
+
+    with ExitStack() as stack:
+        if USE_CASSETTE:
+            try:
+                import vcr
+            except ImportError:
+                print("[WARN] TURN_LOOP_CASSETTE is set but vcrpy is not installed - calling the API live")
+            else:
+                stack.enter_context(vcr.use_cassette(
+                    os.path.join(os.path.dirname(os.path.abspath(__file__)), "cassettes", "turn_loop_5.yaml"),
+                    record_mode="once",
+                    match_on=["method", "uri", "body"],
+                    filter_headers=["x-api-key", "authorization"]
+                ))
+                stack.enter_context(patch("src.agents.teaching_agent.MODAL_AVAILABLE", False))
+                analyze_explanation_modal = generate_question_modal = None
+                if compute_session_analytics:
+                    compute_session_analytics = SimpleNamespace(
+                        spawn=lambda session_data: SimpleNamespace(object_id="cached")
+                    )
+                print(f"[INFO] Replaying Anthropic calls from cassette turn_loop_5.yaml")
+
+        # Create a teaching agent
+        print("\n[TEST] Creating TeachingAgent and simulating 6 turns...")
+        agent = TeachingAgent()
+
+        # Create a test session
+        topic = "Binary Trees"
+        mode = "socratic"
+        session = agent.create_session(
+            user_id="test-user",
+            topic=topic,
+            mode=mode
         )
-        print(f"✓ Question generated: \"{question[:80]}...\"")
-
-        # Step 3: On turn 5, trigger background analytics
-        if i == 5:
-            print(f"\n[ANALYTICS] Turn 5 detected - triggering background analytics...")
-            if MODAL_AVAILABLE and compute_session_analytics:
-                try:
-                    session_data = agent.sessions[session_id]
-                    print(f"  → Session has {len(session_data['analyses'])} analyses")
-                    print(f"  → Session has {len(session_data['conversation_history'])} conversation turns")
-
-                    call = compute_session_analytics.spawn(session_data)
-                    print(f"  ✓ Analytics spawned successfully (call_id: {call.object_id})")
-                    print(f"  → Analytics running in background (not blocking)")
-
-                except Exception as analytics_error:
-                    print(f"  ✗ Analytics failed: {analytics_error}")
-                    import traceback
-                    traceback.print_exc()
+        session_id = session["session_id"]
+        session_data = agent.sessions[session_id]
+        print(f"✓ Session created: {session_id}")
+
+        # The pre-spawn analyses don't depend on each other, so dispatch them at once
+        # instead of paying one round-trip per turn
+        batch = EXPLANATIONS[:PRE_SPAWN_TURNS]
+        try:
+            if MODAL_AVAILABLE and analyze_explanation_modal:
+                print(f"\n[BATCH] Analyzing turns 1-{len(batch)} via Modal .map()...")
+                analyses = list(analyze_explanation_modal.map(batch, kwargs={"topic": topic}))
             else:
-                print(f"  ⊘ Modal not available for analytics")
-
-        print(f"\n✓ Turn {i} completed successfully!")
-
-    except Exception as turn_error:
-        print(f"\n✗ Turn {i} FAILED with error: {turn_error}")
-        import traceback
-        traceback.print_exc()
-        print(f"\n⚠️  Application stopped at turn {i}")
-        break
-
-print("\n" + "=" * 70)
-print("TEST COMPLETE")
-print("=" * 70)
-
-if i == 6:
-    print("✓ All 6 turns completed successfully!")
-    print("  The application should NOT stop after turn 5.")
-else:
-    print(f"✗ Application stopped at turn {i}")
-    print("  This indicates an issue that needs to be fixed.")
-
-print("=" * 70)
+                print(f"\n[BATCH] Modal not available - analyzing turns 1-{len(batch)} on a thread pool...")
+                with ThreadPoolExecutor(max_workers=len(batch)) as executor:
+                    analyses = list(executor.map(
+                        lambda explanation: agent.analyze_explanation(
+                            session_id=session_id,
+                            explanation=explanation
+                        ),
+                        batch
+                    ))
+                # analyze_explanation stored these in completion order; they are re-added per turn below
+                session_data["analyses"].clear()
+            print(f"✓ Batch dispatch complete")
+        except Exception as batch_error:
+            print(f"\n✗ Batch dispatch FAILED with error: {batch_error}")
+            traceback.print_exc()
+            return 1
+
+        completed = 0
+        for i, (explanation, (chars, words)) in enumerate(zip(EXPLANATIONS, EXPL_META), 1):
+            print(f"\n{'='*70}")
+            print(f"TURN {i}  ({chars} chars, {words} words)")
+            print(f"{'='*70}")
+
+            try:
+                # Step 1: Analyze (batched before the spawn, through the agent after it)
+                modal_calls = []
+                with ExitStack() as turn_stack:
+                    if i == 6:
+                        # Record which Modal calls actually succeed on this turn
+                        turn_stack.enter_context(patch(
+                            "src.agents.teaching_agent.analyze_explanation_modal",
+                            _track_remote(analyze_explanation_modal, "analysis", modal_calls)
+                        ))
+                        turn_stack.enter_context(patch(
+                            "src.agents.teaching_agent.generate_question_modal",
+                            _track_remote(generate_question_modal, "question", modal_calls)
+                        ))
+
+                    if i <= len(analyses):
+                        analysis = analyses[i - 1]
+                        session_data["analyses"].append(analysis)
+                    else:
+                        print(f"\n[{i}/6] Analyzing explanation...")
+                        analysis = agent.analyze_explanation(
+                            session_id=session_id,
+                            explanation=explanation
+                        )
+                    print(f"✓ Analysis complete: confidence={analysis['confidence_score']}, clarity={analysis['clarity_score']}")
+
+                    # Step 2: Generate question
+                    print(f"\n[{i}/6] Generating question...")
+                    question = agent.generate_question(
+                        session_id=session_id,
+                        explanation=explanation,
+                        analysis=analysis,
+                        mode=mode
+                    )
+                    print(f"✓ Question generated: \"{question[:80]}...\"")
+
+                # Step 3: On turn 5, trigger background analytics
+                if i == 5:
+                    print(f"\n[ANALYTICS] Turn 5 detected - triggering background analytics...")
+                    if MODAL_AVAILABLE and compute_session_analytics:
+                        try:
+                            print(f"  → Session has {len(session_data['analyses'])} analyses")
+                            print(f"  → Session has {len(session_data['conversation_history'])} conversation turns")
+
+                            call = compute_session_analytics.spawn(session_data)
+                            print(f"  ✓ Analytics spawned successfully (call_id: {call.object_id})")
+                            print(f"  → Analytics running in background (not blocking)")
+
+                        except Exception as analytics_error:
+                            print(f"  ✗ Analytics failed: {analytics_error}")
+                            traceback.print_exc()
+                    else:
+                        print(f"  ⊘ Modal not available for analytics")
+
+                # Step 4: On turn 6, report whether the agent's Modal calls still went through
+                if i == 6:
+                    print(f"\n[CHECK] Modal on turn 6 after the analytics spawn:")
+                    for name in ("analysis", "question"):
+                        print(f"  → {name}: {'✅ Modal' if name in modal_calls else '❌ local fallback'}")
+
+                print(f"\n✓ Turn {i} completed successfully!")
+                completed = i
+
+            except Exception as turn_error:
+                print(f"\n✗ Turn {i} FAILED with error: {turn_error}")
+                traceback.print_exc()
+                print(f"\n⚠️  Application stopped at turn {i}")
+                break
+
+    print("\n" + "=" * 70)
+    print("TEST COMPLETE")
+    print("=" * 70)
+
+    if completed == len(EXPLANATIONS):
+        print("✓ All 6 turns completed successfully!")
+        print("  The application should NOT stop after turn 5.")
+    else:
+        print(f"✗ Application stopped at turn {completed + 1}")
+        print("  This indicates an issue that needs to be fixed.")
+
+    print("=" * 70)
+    return 0 if completed == len(EXPLANATIONS) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,10 +1,20 @@
 """
 Test to check if Modal works through 10 turns including analytics spawn on turn 5 and 10
+
+Usage:
+    python tests/test_turn_6_after_analytics.py
+    python -m unittest tests.test_turn_6_after_analytics -v
 """
 
 import os
 import sys
 import io
+import traceback
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from types import SimpleNamespace
+from unittest.mock import patch
 
 # Fix encoding issues on Windows
 if sys.platform == 'win32':
@@ -13,10 +23,6 @@ if sys.platform == 'win32':
 from dotenv import load_dotenv
 load_dotenv()
 
-print("=" * 70)
-print("10-TURN MODAL TEST (Analytics on turns 5 and 10)")
-print("=" * 70)
-
 # Import the TeachingAgent
 from src.agents.teaching_agent import (
     TeachingAgent,
@@ -26,117 +32,286 @@ from src.agents.teaching_agent import (
     generate_question_modal
 )
 
-print(f"\n[INFO] MODAL_AVAILABLE: {MODAL_AVAILABLE}")
-print(f"[INFO] analyze_explanation_modal: {analyze_explanation_modal}")
-print(f"[INFO] generate_question_modal: {generate_question_modal}")
-print(f"[INFO] compute_session_analytics: {compute_session_analytics}")
+# Explanations for each turn, plus (char count, word count) computed once up front
+EXPLANATIONS = (
+    "A binary tree is a hierarchical data structure.",  # Turn 1
+    "Each node in a binary tree has at most two children.",  # Turn 2
+    "The children are called left child and right child.",  # Turn 3
+    "Binary trees are used for efficient searching.",  # Turn 4
+    "The root is the topmost node in the tree.",  # Turn 5 - Analytics trigger
+    "Traversal methods include inorder, preorder, and postorder.",  # Turn 6 - Post-analytics test
+    "A leaf node has no children.",  # Turn 7
+    "The height of a tree is the longest path from root to leaf.",  # Turn 8
+    "Binary search trees maintain sorted order.",  # Turn 9
+    "Balanced trees ensure O(log n) operations.",  # Turn 10 - Analytics trigger
+)
+EXPL_META = tuple((len(e), e.count(' ') + 1) for e in EXPLANATIONS)
+
+# Turns before the first analytics spawn can be analyzed in one batch
+PRE_SPAWN_TURNS = 4
 
-# Create a teaching agent
-print("\n[TEST] Creating TeachingAgent and simulating 10 turns with analytics on turns 5 and 10...")
-agent = TeachingAgent()
+TOPIC = "Binary Trees"
+MODE = "socratic"
 
-# Create a test session
-session = agent.create_session(
-    user_id="test-user",
-    topic="Binary Trees",
-    mode="socratic"
-)
-session_id = session["session_id"]
-print(f"✓ Session created: {session_id}")
-
-# Simulate turns 1-10
-test_explanations = [
-    "A binary tree is a hierarchical data structure.",                    # Turn 1
-    "Each node in a binary tree has at most two children.",               # Turn 2
-    "The children are called left child and right child.",                # Turn 3
-    "Binary trees are used for efficient searching.",                     # Turn 4
-    "The root is the topmost node in the tree.",                         # Turn 5 - Analytics trigger
-    "Traversal methods include inorder, preorder, and postorder.",       # Turn 6 - Post-analytics test
-    "A leaf node has no children.",                                      # Turn 7
-    "The height of a tree is the longest path from root to leaf.",      # Turn 8
-    "Binary search trees maintain sorted order.",                        # Turn 9
-    "Balanced trees ensure O(log n) operations."                         # Turn 10 - Analytics trigger
-]
-
-analytics_call = None
-
-for i, explanation in enumerate(test_explanations, 1):
-    print(f"\n{'='*70}")
-    print(f"TURN {i}")
-    print(f"{'='*70}")
-
-    try:
-        # Analyze
-        print(f"\n[{i}/6] Analyzing explanation...")
-        analysis = agent.analyze_explanation(
-            session_id=session_id,
-            explanation=explanation
-        )
-        print(f"✓ Analysis: confidence={analysis['confidence_score']}, clarity={analysis['clarity_score']}")
-
-        # Generate question
-        print(f"\n[{i}/6] Generating question...")
-        question = agent.generate_question(
-            session_id=session_id,
-            explanation=explanation,
-            analysis=analysis,
-            mode="socratic"
+# TURN_LOOP_CASSETTE=true records the Anthropic traffic on the first run and
+# replays it afterwards. Modal is bypassed so every call goes through the local
+# client, and analytics spawns return a stub call instead of hitting Modal.
+USE_CASSETTE = os.getenv("TURN_LOOP_CASSETTE", "false").lower() == "true"
+
+
+class TestTurnLoop(unittest.TestCase):
+    """10-turn session with background analytics spawned on turns 5 and 10"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Resolve the Modal handles (or the cassette stand-ins) and create the agent"""
+        print("=" * 70)
+        print("10-TURN MODAL TEST (Analytics on turns 5 and 10)")
+        print("=" * 70)
+
+        print(f"\n[INFO] MODAL_AVAILABLE: {MODAL_AVAILABLE}")
+        print(f"[INFO] analyze_explanation_modal: {analyze_explanation_modal}")
+        print(f"[INFO] generate_question_modal: {generate_question_modal}")
+        print(f"[INFO] compute_session_analytics: {compute_session_analytics}")
+
+        cls.analyze_modal = analyze_explanation_modal
+        cls.question_modal = generate_question_modal
+        cls.analytics_fn = compute_session_analytics
+
+        if USE_CASSETTE:
+            try:
+                import vcr
+            except ImportError:
+                print("[WARN] TURN_LOOP_CASSETTE is set but vcrpy is not installed - calling the API live")
+            else:
+                stack = ExitStack()
+                cls.addClassCleanup(stack.close)
+                stack.enter_context(vcr.use_cassette(
+                    os.path.join(os.path.dirname(os.path.abspath(__file__)), "cassettes", "turn_loop_10.yaml"),
+                    record_mode="once",
+                    match_on=["method", "uri", "body"],
+                    filter_headers=["x-api-key", "authorization"]
+                ))
+                stack.enter_context(patch("src.agents.teaching_agent.MODAL_AVAILABLE", False))
+                cls.analyze_modal = cls.question_modal = None
+                if cls.analytics_fn:
+                    cls.analytics_fn = SimpleNamespace(
+                        spawn=lambda session_data: SimpleNamespace(object_id="cached")
+                    )
+                print(f"[INFO] Replaying Anthropic calls from cassette turn_loop_10.yaml")
+
+        print("\n[TEST] Creating TeachingAgent...")
+        cls.agent = TeachingAgent()
+
+    def _new_session(self):
+        """Create a session that is dropped from the agent when the test ends"""
+        session = self.agent.create_session(
+            user_id="test-user",
+            topic=TOPIC,
+            mode=MODE
         )
-        print(f"✓ Question: \"{question[:80]}...\"")
+        session_id = session["session_id"]
+        self.addCleanup(self.agent.sessions.pop, session_id, None)
+        print(f"✓ Session created: {session_id}")
+        return session
 
-        # On turn 5 and 10, spawn analytics
-        if i % 5 == 0:  # Every 5th turn
-            print(f"\n[ANALYTICS] Turn {i} - spawning background analytics...")
-            if MODAL_AVAILABLE and compute_session_analytics:
-                try:
-                    session_data = agent.sessions[session_id]
-                    analytics_call = compute_session_analytics.spawn(session_data)
-                    print(f"✓ Analytics spawned: {analytics_call.object_id}")
-                    print(f"  → Running in background (non-blocking)")
-                except Exception as analytics_error:
-                    print(f"✗ Analytics spawn failed: {analytics_error}")
-                    import traceback
-                    traceback.print_exc()
-
-        # After analytics spawns (turns 6 and 11), verify Modal still works
-        if i in [6]:
-            print(f"\n{'='*70}")
-            print(f"CRITICAL CHECK: Turn {i} after analytics spawn")
-            print(f"{'='*70}")
-            print(f"[CHECK] Did Modal work on turn {i}?")
-            print(f"  → If you see [MODAL] messages above: ✅ YES")
-            print(f"  → If you see [LOCAL] messages above: ❌ NO - Modal stopped working")
-
-            # Check if analytics completed
-            if analytics_call:
+    def _dispatch_batch(self, session):
+        """
+        Analyze the turns before the first analytics spawn up front.
+
+        Those analyses don't depend on each other, so they are dispatched all at
+        once instead of paying one round-trip per turn. Later turns go through
+        the agent one at a time, so a failure after the spawn shows up.
+
+        Args:
+            session: Session dict returned by create_session
+
+        Returns:
+            List of analyses for turns 1 to PRE_SPAWN_TURNS
+        """
+        session_id = session["session_id"]
+        batch = EXPLANATIONS[:PRE_SPAWN_TURNS]
+        if MODAL_AVAILABLE and self.analyze_modal:
+            print(f"\n[BATCH] Analyzing turns 1-{len(batch)} via Modal .map()...")
+            return list(self.analyze_modal.map(batch, kwargs={"topic": TOPIC}))
+
+        print(f"\n[BATCH] Modal not available - analyzing turns 1-{len(batch)} on a thread pool...")
+        with ThreadPoolExecutor(max_workers=len(batch)) as executor:
+            analyses = list(executor.map(
+                lambda explanation: self.agent.analyze_explanation(
+                    session_id=session_id,
+                    explanation=explanation
+                ),
+                batch
+            ))
+        # analyze_explanation stored these in completion order; they are re-added per turn
+        self.agent.sessions[session_id]["analyses"].clear()
+        return analyses
+
+    def _track_modal(self, succeeded):
+        """
+        Patch the agent's Modal functions to record each .remote() call that returned.
+
+        Args:
+            succeeded: List that "analysis"/"question" is appended to per successful call
+
+        Returns:
+            ExitStack holding the patches
+        """
+        stack = ExitStack()
+        for target, fn, name in (
+            ("analyze_explanation_modal", self.analyze_modal, "analysis"),
+            ("generate_question_modal", self.question_modal, "question")
+        ):
+            if fn is None:
+                continue
+
+            def remote(*args, _fn=fn, _name=name, **kwargs):
+                result = _fn.remote(*args, **kwargs)
+                succeeded.append(_name)
+                return result
+
+            stack.enter_context(patch(f"src.agents.teaching_agent.{target}", SimpleNamespace(remote=remote)))
+        return stack
+
+    def test_turn_sequence(self):
+        """Turns 1-10 on one session, with analytics spawned every 5th turn"""
+        agent = self.agent
+        session = self._new_session()
+        session_id = session["session_id"]
+        session_data = agent.sessions[session_id]
+        analyses = self._dispatch_batch(session)
+        print(f"✓ Batch dispatch complete")
+
+        analytics_call = None
+        completed = []
+
+        for i, (explanation, (chars, words)) in enumerate(zip(EXPLANATIONS, EXPL_META), 1):
+            # Collect the turn's output and write it in one go at the end of the turn
+            log = []
+            with self.subTest(turn=i):
                 try:
-                    print(f"\n[CHECK] Analytics status:")
-                    print(f"  → Call ID: {analytics_call.object_id}")
-                    print(f"  → Analytics may still be running in background")
-                except Exception as e:
-                    print(f"  → Could not check analytics: {e}")
-
-        print(f"\n✓ Turn {i} completed successfully!")
-
-    except Exception as turn_error:
-        print(f"\n✗ Turn {i} FAILED: {turn_error}")
-        import traceback
-        traceback.print_exc()
-        break
-
-print("\n" + "=" * 70)
-print("TEST COMPLETE")
-print("=" * 70)
-
-if i >= 10:
-    print("✓ Successfully completed ALL 10 turns!")
-    print("\nSummary:")
-    print("  - Turn 5: Analytics spawned ✓")
-    print("  - Turn 6-9: Continued working after first analytics ✓")
-    print("  - Turn 10: Second analytics spawned ✓")
-    print("\n✅ Modal functions worked correctly throughout all turns")
-else:
-    print(f"✗ Test stopped at turn {i}")
-    print(f"❌ Application failed before completing all 10 turns")
-
-print("=" * 70)
+                    log.append(f"\n{'='*70}")
+                    log.append(f"TURN {i}  ({chars} chars, {words} words)")
+                    log.append(f"{'='*70}")
+
+                    modal_calls = []
+                    with ExitStack() as turn_stack:
+                        if i == 6:
+                            turn_stack.enter_context(self._track_modal(modal_calls))
+
+                        # Analyze (batched before the first spawn, through the agent after it)
+                        if i <= len(analyses):
+                            analysis = analyses[i - 1]
+                            session_data["analyses"].append(analysis)
+                        else:
+                            log.append(f"\n[{i}/{len(EXPLANATIONS)}] Analyzing explanation...")
+                            analysis = agent.analyze_explanation(
+                                session_id=session_id,
+                                explanation=explanation
+                            )
+                        log.append(f"✓ Analysis: confidence={analysis['confidence_score']}, clarity={analysis['clarity_score']}")
+
+                        log.append(f"\n[{i}/{len(EXPLANATIONS)}] Generating question...")
+                        question = agent.generate_question(
+                            session_id=session_id,
+                            explanation=explanation,
+                            analysis=analysis,
+                            mode=MODE
+                        )
+                        log.append(f"✓ Question: \"{question[:80]}...\"")
+
+                    # On turn 5 and 10, spawn analytics
+                    if i % 5 == 0:  # Every 5th turn
+                        log.append(f"\n[ANALYTICS] Turn {i} - spawning background analytics...")
+                        if MODAL_AVAILABLE and self.analytics_fn:
+                            try:
+                                analytics_call = self.analytics_fn.spawn(session_data)
+                                log.append(f"✓ Analytics spawned: {analytics_call.object_id}")
+                                log.append(f"  → Running in background (non-blocking)")
+                            except Exception as analytics_error:
+                                log.append(f"✗ Analytics spawn failed: {analytics_error}")
+                                log.append(traceback.format_exc().rstrip())
+
+                    # After the first analytics spawn, verify the agent still reached Modal
+                    if i == 6:
+                        log.append(f"\n{'='*70}")
+                        log.append(f"CRITICAL CHECK: Turn {i} after analytics spawn")
+                        log.append(f"{'='*70}")
+                        log.append(f"[CHECK] Did Modal work on turn {i}?")
+                        for name in ("analysis", "question"):
+                            log.append(f"  → {name}: {'✅ YES' if name in modal_calls else '❌ NO - local fallback'}")
+
+                        # Check if analytics completed
+                        if analytics_call:
+                            try:
+                                log.append(f"\n[CHECK] Analytics status:")
+                                log.append(f"  → Call ID: {analytics_call.object_id}")
+                                log.append(f"  → Analytics may still be running in background")
+                            except Exception as e:
+                                log.append(f"  → Could not check analytics: {e}")
+
+                        if MODAL_AVAILABLE and self.analyze_modal:
+                            self.assertIn("analysis", modal_calls, "analysis fell back to local after the analytics spawn")
+                        if MODAL_AVAILABLE and self.question_modal:
+                            self.assertIn("question", modal_calls, "question fell back to local after the analytics spawn")
+
+                    log.append(f"\n✓ Turn {i} completed successfully!")
+                    completed.append(i)
+                finally:
+                    sys.stdout.write("\n".join(log) + "\n")
+                    sys.stdout.flush()
+
+        print("\n" + "=" * 70)
+        print("TEST COMPLETE")
+        print("=" * 70)
+
+        if len(completed) == len(EXPLANATIONS):
+            print("✓ Successfully completed ALL 10 turns!")
+            print("\nSummary:")
+            print("  - Turn 5: Analytics spawned ✓")
+            print("  - Turn 6-9: Continued working after first analytics ✓")
+            print("  - Turn 10: Second analytics spawned ✓")
+            print("\n✅ Modal functions worked correctly throughout all turns")
+        else:
+            failed = sorted(set(range(1, len(EXPLANATIONS) + 1)) - set(completed))
+            print(f"✗ Turns failed: {failed}")
+            print(f"❌ Application failed before completing all 10 turns")
+
+        print("=" * 70)
+
+    def test_turn_parallel(self):
+        """Every turn's analyze + generate at once, each on a fresh session"""
+        # Sessions are created up front so worker threads never add to the sessions dict
+        sessions = [self._new_session() for _ in EXPLANATIONS]
+
+        def run_turn(session, explanation):
+            analysis = self.agent.analyze_explanation(
+                session_id=session["session_id"],
+                explanation=explanation
+            )
+            question = self.agent.generate_question(
+                session_id=session["session_id"],
+                explanation=explanation,
+                analysis=analysis,
+                mode=MODE
+            )
+            return analysis, question
+
+        print(f"\n[PARALLEL] Running {len(EXPLANATIONS)} independent turns on a thread pool...")
+        with ThreadPoolExecutor(max_workers=len(EXPLANATIONS)) as executor:
+            futures = [
+                executor.submit(run_turn, session, explanation)
+                for session, explanation in zip(sessions, EXPLANATIONS)
+            ]
+            for i, future in enumerate(futures, 1):
+                with self.subTest(turn=i):
+                    analysis, question = future.result()
+                    self.assertIn("confidence_score", analysis)
+                    self.assertIn("clarity_score", analysis)
+                    self.assertIsInstance(question, str)
+                    print(f"✓ Turn {i}: clarity={analysis['clarity_score']}, question=\"{question[:60]}...\"")
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)